@@ -26,6 +26,8 @@ from .guasti_core import (
     sigma,
     is_prime,
     get_divisor_pairs,
+    AnalyzedNumber,
+    analyze,
 )
 
 __version__ = "2.0.0"
@@ -43,4 +45,6 @@ __all__ = [
     "sigma",
     "is_prime",
     "get_divisor_pairs",
+    "AnalyzedNumber",
+    "analyze",
 ]
@@ -6,8 +6,11 @@ Core mathematical functions for the Guasti Transform.
 
 This module contains:
 - Basic number theory functions (tau, sigma, is_prime)
+- Sieve-backed range tables (tau, sigma, DF, primality for all n ≤ N)
+- AnalyzedNumber: one factorization shared by every per-n metric
 - Guasti transform and angular signatures
 - Theorem verification functions
+- Batch RSA modulus scanning (bounded Fermat search)
 - Classification utilities
 
 Author: Alexandre Guasti
@@ -15,8 +18,55 @@ License: MIT
 """
 
 import numpy as np
-from math import sqrt, log, pi, gcd
-from typing import List, Tuple, Set, Dict, Optional, Any
+from collections import OrderedDict
+from functools import cached_property
+from math import sqrt, log, pi, gcd, isqrt, atan2, degrees
+from types import MappingProxyType
+from typing import List, Tuple, Set, Dict, Optional, Any, Mapping, Iterable, Iterator
+
+try:
+    from .src.primality import is_prime64
+    from .src.factor import factorize as _factorize_rho, divisors_from_factorization
+except ImportError:  # run as a script (python guasti_core.py) or imported from the repo root
+    from src.primality import is_prime64
+    from src.factor import factorize as _factorize_rho, divisors_from_factorization
+
+
+# Tables installed by precompute_tables(); scalar functions read them when n is in range.
+_TABLES: Optional[Dict[str, np.ndarray]] = None
+
+
+def _table(name: str, n: int) -> Optional[np.ndarray]:
+    """Return the installed table `name` if it covers n, else None."""
+    if _TABLES is not None and 0 <= n < len(_TABLES[name]):
+        return _TABLES[name]
+    return None
+
+
+class _LRUCache:
+    """AnalyzedNumber objects keyed by n, with LRU eviction."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[int, AnalyzedNumber]" = OrderedDict()
+
+    def lookup(self, n: int) -> "AnalyzedNumber":
+        entry = self._data.get(n)
+        if entry is not None:
+            self.hits += 1
+            self._data.move_to_end(n)
+            return entry
+        self.misses += 1
+        entry = self._data[n] = AnalyzedNumber(n)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        return entry
+
+
+# Opt-in cache set by enable_cache(); None means every call recomputes.
+_CACHE: Optional[_LRUCache] = None
 
 
 # =============================================================================
@@ -44,8 +94,13 @@ def is_prime(n: int) -> bool:
     >>> is_prime(18)
     False
     """
+    t = _table('is_prime', n)
+    if t is not None:
+        return bool(t[n])
     if n < 2:
         return False
+    if n < 1 << 64:
+        return is_prime64(n)  # deterministic Miller-Rabin below 2^64
     if n == 2:
         return True
     if n % 2 == 0:
@@ -77,13 +132,7 @@ def tau(n: int) -> int:
     >>> tau(7)   # Prime: only 1 and 7
     2
     """
-    if n <= 0:
-        return 0
-    count = 0
-    for i in range(1, int(sqrt(n)) + 1):
-        if n % i == 0:
-            count += 2 if i != n // i else 1
-    return count
+    return analyze(n).tau
 
 
 def sigma(n: int) -> int:
@@ -105,15 +154,7 @@ def sigma(n: int) -> int:
     >>> sigma(12)  # 1 + 2 + 3 + 4 + 6 + 12 = 28
     28
     """
-    if n <= 0:
-        return 0
-    total = 0
-    for i in range(1, int(sqrt(n)) + 1):
-        if n % i == 0:
-            total += i
-            if i != n // i:
-                total += n // i
-    return total
+    return analyze(n).sigma
 
 
 def get_divisors(n: int) -> List[int]:
@@ -135,21 +176,16 @@ def get_divisors(n: int) -> List[int]:
     >>> get_divisors(12)
     [1, 2, 3, 4, 6, 12]
     """
-    if n <= 0:
-        return []
-    divisors = []
-    for i in range(1, int(sqrt(n)) + 1):
-        if n % i == 0:
-            divisors.append(i)
-            if i != n // i:
-                divisors.append(n // i)
-    return sorted(divisors)
+    return list(analyze(n).divisors)
 
 
 def get_divisor_pairs(n: int) -> List[Tuple[int, int]]:
     """
     Get all divisor pairs (d, n/d) where d ≤ √n.
     
+    Divisors are enumerated from the prime factorization, so the cost
+    scales with τ(n) instead of √n.
+    
     Parameters
     ----------
     n : int
@@ -165,13 +201,50 @@ def get_divisor_pairs(n: int) -> List[Tuple[int, int]]:
     >>> get_divisor_pairs(12)
     [(1, 12), (2, 6), (3, 4)]
     """
-    if n <= 0:
-        return []
-    pairs = []
-    for d in range(1, int(sqrt(n)) + 1):
-        if n % d == 0:
-            pairs.append((d, n // d))
-    return pairs
+    return list(analyze(n).pairs)
+
+
+def prime_factorization(n: int) -> Dict[int, int]:
+    """
+    Compute the prime factorization of n as {p: exponent}.
+    
+    Uses the installed sieve tables when n is in range, otherwise trial
+    division by small primes then Pollard rho with the deterministic
+    64-bit Miller-Rabin test of src/primality (strong probable-prime
+    test beyond 2^64).
+    
+    Parameters
+    ----------
+    n : int
+        A positive integer.
+        
+    Returns
+    -------
+    Dict[int, int]
+        Prime factors in increasing order with their exponents
+        (empty for n = 1).
+        
+    Examples
+    --------
+    >>> prime_factorization(360)
+    {2: 3, 3: 2, 5: 1}
+    """
+    return dict(analyze(n).factors)
+
+
+def _prime_factorization(n: int) -> Dict[int, int]:
+    spf = _table('spf', n)
+    if spf is None:
+        return _factorize_rho(n)
+    factors: Dict[int, int] = {}
+    while n > 1:
+        p = int(spf[n])
+        e = 0
+        while n % p == 0:
+            n //= p
+            e += 1
+        factors[p] = e
+    return factors
 
 
 def factorization_density(n: int) -> int:
@@ -198,32 +271,327 @@ def factorization_density(n: int) -> int:
     >>> factorization_density(360)  # 2³ × 3² × 5
     6
     """
-    if n <= 1:
-        return 0
-    if is_prime(n):
-        return 0
+    return analyze(n).df
+
+
+# =============================================================================
+# SIEVE-BACKED RANGE TABLES
+# =============================================================================
+
+def arithmetic_tables(N: int) -> Dict[str, np.ndarray]:
+    """
+    Compute arithmetic functions for every n in [0, N] with one sieve pass.
     
-    density = 0
-    temp_n = n
+    Each prime power p^k ≤ N (p ≤ √N) updates its multiples with a strided
+    slice; the cofactor left after removing those primes is 1 or a single
+    prime > √N. Cost is O(N log log N) array work and O(√N) Python steps.
     
-    for p in range(2, int(sqrt(n)) + 1):
-        if temp_n == 1:
-            break
-        while temp_n % p == 0:
-            density += 1
-            temp_n //= p
+    Parameters
+    ----------
+    N : int
+        Upper bound (inclusive).
+        
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        Arrays of length N+1 indexed by n:
+        'spf' (smallest prime factor, 0 for n < 2), 'tau', 'sigma',
+        'omega' (Ω(n), prime factors with multiplicity),
+        'df' (factorization density: Ω(n), but 0 for primes) and 'is_prime'.
+        Values at 0 follow the scalar functions (τ(0) = σ(0) = 0).
+        
+    Examples
+    --------
+    >>> t = arithmetic_tables(12)
+    >>> int(t['tau'][12]), int(t['sigma'][12]), int(t['df'][12])
+    (6, 28, 3)
+    """
+    N = max(int(N), 1)
+    n = np.arange(N + 1, dtype=np.int64)
+    rem = n.copy()
+    spf = np.zeros(N + 1, dtype=np.int64)
+    tau_arr = np.ones(N + 1, dtype=np.int64)
+    sigma_arr = np.ones(N + 1, dtype=np.int64)
+    omega = np.zeros(N + 1, dtype=np.int16)
+
+    root = isqrt(N)
+    small = np.ones(root + 1, dtype=bool)
+    small[:2] = False
+    for i in range(2, isqrt(root) + 1):
+        if small[i]:
+            small[i * i::i] = False
+
+    for p in np.flatnonzero(small).tolist():
+        view = spf[p::p]
+        view[view == 0] = p
+        pk, k = p, 1
+        s_prev, s_cur = 1, 1 + p              # σ(p^(k-1)), σ(p^k)
+        while pk <= N:
+            rem[pk::pk] //= p
+            omega[pk::pk] += 1
+            tau_arr[pk::pk] //= k
+            tau_arr[pk::pk] *= k + 1
+            sigma_arr[pk::pk] //= s_prev
+            sigma_arr[pk::pk] *= s_cur
+            pk *= p
+            k += 1
+            s_prev, s_cur = s_cur, s_cur + pk
+
+    big = rem > 1                             # one prime factor > √N left
+    spf[big & (spf == 0)] = n[big & (spf == 0)]
+    tau_arr[big] *= 2
+    sigma_arr[big] *= rem[big] + 1
+    omega[big] += 1
+
+    prime = omega == 1
+    prime[:2] = False
+    tau_arr[0] = sigma_arr[0] = 0
+    df = np.where(prime, 0, omega).astype(np.int16)
+    return {
+        'spf': spf,
+        'tau': tau_arr,
+        'sigma': sigma_arr,
+        'omega': omega,
+        'df': df,
+        'is_prime': prime,
+    }
+
+
+def precompute_tables(N: int) -> Dict[str, np.ndarray]:
+    """
+    Compute arithmetic_tables(N) and install them for the scalar functions.
     
-    if temp_n > 1:  # Remaining prime factor
-        density += 1
+    Afterwards is_prime, tau, sigma, get_divisors and factorization_density
+    answer from the tables for 0 ≤ n ≤ N. Above N they factor through
+    src/factor (trial division, then Pollard rho), and is_prime uses the
+    deterministic Miller-Rabin test below 2^64.
     
-    return density
+    Parameters
+    ----------
+    N : int
+        Upper bound (inclusive).
+        
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        The installed tables.
+    """
+    global _TABLES
+    _TABLES = arithmetic_tables(N)
+    return _TABLES
+
+
+def clear_tables() -> None:
+    """Uninstall the tables set by precompute_tables()."""
+    global _TABLES
+    _TABLES = None
+
+
+# =============================================================================
+# MEMOIZATION
+# =============================================================================
+
+def enable_cache(maxsize: int = 4096) -> None:
+    """
+    Turn on the shared per-n cache (LRU, at most `maxsize` numbers).
+    
+    analyze(n) then returns the same AnalyzedNumber for repeated n, so
+    every metric computed from it (and every free function wrapping it)
+    reuses one factorization across calls. Re-enabling resets the cache.
+    
+    Parameters
+    ----------
+    maxsize : int, optional
+        Maximum number of n kept (default: 4096).
+    """
+    global _CACHE
+    if maxsize <= 0:
+        raise ValueError("maxsize must be positive")
+    _CACHE = _LRUCache(maxsize)
+
+
+def disable_cache() -> None:
+    """Turn off (and drop) the cache set by enable_cache()."""
+    global _CACHE
+    _CACHE = None
+
+
+def cache_info() -> Optional[Dict[str, int]]:
+    """
+    Cache statistics, or None when caching is off.
+    
+    Returns
+    -------
+    Optional[Dict[str, int]]
+        {'hits', 'misses', 'size', 'maxsize'}; a hit is a lookup of an n
+        whose record was already cached.
+    """
+    if _CACHE is None:
+        return None
+    return {
+        'hits': _CACHE.hits,
+        'misses': _CACHE.misses,
+        'size': len(_CACHE._data),
+        'maxsize': _CACHE.maxsize,
+    }
+
+
+# =============================================================================
+# ANALYZED NUMBER
+# =============================================================================
+
+class AnalyzedNumber:
+    """
+    One integer n, factored once, with every Guasti metric derived lazily.
+    
+    Each attribute is computed on first access and kept on the instance;
+    the free functions (tau, sigma, get_divisors, get_divisor_pairs,
+    prime_factorization, factorization_density, angular_signature,
+    delta_45, multiplicative_entropy) are thin wrappers over analyze(n),
+    so with enable_cache() they all share a single factorization of n.
+    Attributes are immutable (mappings, tuples, frozensets); the wrappers
+    return mutable copies.
+    
+    Parameters
+    ----------
+    n : int
+        The number to analyze (n ≤ 0 gives empty/zero metrics).
+        
+    Examples
+    --------
+    >>> a = analyze(360)
+    >>> dict(a.factors), a.tau, a.sigma, a.df
+    ({2: 3, 3: 2, 5: 1}, 24, 1170, 6)
+    >>> a.classification
+    'COMPOSITE'
+    """
+
+    def __init__(self, n: int):
+        self.n = n
+
+    def __repr__(self) -> str:
+        return f"AnalyzedNumber({self.n})"
+
+    @cached_property
+    def factors(self) -> Mapping[int, int]:
+        """Prime factorization {p: e} in increasing p (empty for n ≤ 1)."""
+        return MappingProxyType(_prime_factorization(self.n) if self.n > 1 else {})
+
+    @cached_property
+    def divisors(self) -> Tuple[int, ...]:
+        """All divisors of n in increasing order."""
+        if self.n <= 0:
+            return ()
+        return tuple(divisors_from_factorization(self.factors))
+
+    @cached_property
+    def pairs(self) -> Tuple[Tuple[int, int], ...]:
+        """Divisor pairs (d, n/d) with d ≤ √n."""
+        n = self.n
+        return tuple((d, n // d) for d in self.divisors if d * d <= n)
+
+    @cached_property
+    def signature(self) -> frozenset:
+        """Angular signature Θ(n), angles in degrees rounded to 0.1."""
+        if self.n <= 1:
+            return frozenset()
+        angles = set()
+        for d, q in self.pairs:
+            if d == 1:
+                theta = 90.0  # log(1) = 0, so vertical
+            elif q == 1:
+                theta = 0.0   # log(1) = 0, so horizontal
+            else:
+                theta = degrees(atan2(log(q), log(d)))
+            angles.add(round(theta, 1))
+        return frozenset(angles)
+
+    @cached_property
+    def delta_45(self) -> float:
+        """Minimum angular distance of the signature to 45° (45 if empty)."""
+        if not self.signature:
+            return 45.0
+        return min(abs(theta - 45.0) for theta in self.signature)
+
+    @cached_property
+    def tau(self) -> int:
+        """Number of divisors τ(n)."""
+        if self.n <= 0:
+            return 0
+        t = _table('tau', self.n)
+        if t is not None:
+            return int(t[self.n])
+        count = 1
+        for e in self.factors.values():
+            count *= e + 1
+        return count
+
+    @cached_property
+    def sigma(self) -> int:
+        """Sum of divisors σ(n)."""
+        if self.n <= 0:
+            return 0
+        t = _table('sigma', self.n)
+        if t is not None:
+            return int(t[self.n])
+        total = 1
+        for p, e in self.factors.items():
+            total *= (p ** (e + 1) - 1) // (p - 1)
+        return total
+
+    @cached_property
+    def df(self) -> int:
+        """Factorization density DF(n) (0 for n ≤ 1 and for primes)."""
+        if self.n <= 1:
+            return 0
+        t = _table('df', self.n)
+        if t is not None:
+            return int(t[self.n])
+        exponents = list(self.factors.values())
+        return 0 if exponents == [1] else sum(exponents)
+
+    @cached_property
+    def entropy(self) -> float:
+        """Multiplicative entropy log₂(τ(n))."""
+        return np.log2(self.tau) if self.tau > 0 else 0
+
+    @cached_property
+    def classification(self) -> str:
+        """Signature class, as classify_by_signature (no factorization needed)."""
+        return classify_by_signature(self.n)
+
+    def transform(self, N_max: int = 1000) -> Dict[str, Any]:
+        """Guasti transform of n for the given N_max (see guasti_transform)."""
+        return guasti_transform(self.n, N_max)
+
+
+def analyze(n: int) -> AnalyzedNumber:
+    """
+    Return the AnalyzedNumber for n.
+    
+    With enable_cache() on, repeated calls for the same n return the same
+    object (LRU-bounded); otherwise a fresh one is built each call.
+    
+    Parameters
+    ----------
+    n : int
+        The number to analyze.
+        
+    Returns
+    -------
+    AnalyzedNumber
+        Lazy view of n's factorization and derived metrics.
+    """
+    if _CACHE is None:
+        return AnalyzedNumber(n)
+    return _CACHE.lookup(n)
 
 
 # =============================================================================
 # GUASTI TRANSFORM
 # =============================================================================
 
-def guasti_transform(n: int, N_max: int = 1000) -> Dict[str, float]:
+def guasti_transform(n, N_max: int = 1000) -> Dict[str, Any]:
     """
     Compute the Guasti Transform of n.
     
@@ -231,23 +599,31 @@ def guasti_transform(n: int, N_max: int = 1000) -> Dict[str, float]:
     
     Parameters
     ----------
-    n : int
-        The number to transform.
+    n : int or array_like of int
+        The number to transform, or an array of numbers (all transformed
+        with the same N_max in one vectorized pass).
     N_max : int, optional
         Maximum value for normalization (default: 1000).
         
     Returns
     -------
-    Dict[str, float]
+    Dict[str, Any]
         Dictionary with 'r' (radius), 'theta' (angle in degrees),
-        'x' and 'y' (Cartesian coordinates).
+        'theta_rad', 'x' and 'y' (Cartesian coordinates).
+        For array input each value is a float64 array shaped like n
+        (columnar result), and entries with n ≤ 0 are 0.
         
     Examples
     --------
     >>> result = guasti_transform(100, N_max=1000)
     >>> print(f"r = {result['r']:.2f}, θ = {result['theta']:.2f}°")
     r = 10.00, θ = 240.00°
+    >>> cols = guasti_transform(np.arange(1, 1001), N_max=1000)
+    >>> cols['x'].shape
+    (1000,)
     """
+    if np.ndim(n) > 0:
+        return _guasti_transform_array(np.asarray(n), N_max)
     if n <= 0:
         return {'r': 0, 'theta': 0, 'x': 0, 'y': 0}
     
@@ -267,6 +643,24 @@ def guasti_transform(n: int, N_max: int = 1000) -> Dict[str, float]:
     }
 
 
+def _guasti_transform_array(n: np.ndarray, N_max: int) -> Dict[str, np.ndarray]:
+    """Columnar guasti_transform for an array of n (see guasti_transform)."""
+    valid = n > 0
+    nf = np.where(valid, n, 1).astype(np.float64)
+    r = np.where(valid, np.sqrt(nf), 0.0)
+    if N_max > 1:
+        theta_rad = np.where(valid, 2 * pi * np.log(nf) / log(N_max), 0.0)
+    else:
+        theta_rad = np.zeros(n.shape, dtype=np.float64)
+    return {
+        'r': r,
+        'theta': np.degrees(theta_rad) % 360,
+        'theta_rad': theta_rad,
+        'x': r * np.cos(theta_rad),
+        'y': r * np.sin(theta_rad),
+    }
+
+
 def angular_signature(n: int) -> Set[float]:
     """
     Compute the Guasti angular signature Θ(n).
@@ -274,6 +668,9 @@ def angular_signature(n: int) -> Set[float]:
     For each divisor pair (d, n/d), the angle is:
     θ = arctan2(log(n/d), log(d))
     
+    The pairs come from the prime factorization (see get_divisor_pairs),
+    so large n with few divisors stay cheap.
+    
     Parameters
     ----------
     n : int
@@ -291,22 +688,7 @@ def angular_signature(n: int) -> Set[float]:
     >>> angular_signature(17)  # Prime
     {90.0}  # Only one angle (besides 0°)
     """
-    if n <= 1:
-        return set()
-    
-    pairs = get_divisor_pairs(n)
-    angles = set()
-    
-    for d, q in pairs:
-        if d == 1:
-            theta = 90.0  # log(1) = 0, so vertical
-        elif q == 1:
-            theta = 0.0   # log(1) = 0, so horizontal
-        else:
-            theta = np.degrees(np.arctan2(np.log(q), np.log(d)))
-        angles.add(round(theta, 1))
-    
-    return angles
+    return set(analyze(n).signature)
 
 
 def delta_45(n: int) -> float:
@@ -331,22 +713,36 @@ def delta_45(n: int) -> float:
     >>> delta_45(35)  # Not a square
     2.3  # Some positive distance
     """
-    sig = angular_signature(n)
-    if not sig:
-        return 45.0
-    return min(abs(theta - 45.0) for theta in sig)
+    return analyze(n).delta_45
 
 
 # =============================================================================
 # THEOREM VERIFICATION FUNCTIONS
 # =============================================================================
 
+def signature_has_45(sig: Set[float]) -> bool:
+    """Check whether a (rounded) angular signature contains 45°."""
+    return any(abs(theta - 45.0) < 0.1 for theta in sig)
+
+
+def signature_is_prime_square(sig: Set[float]) -> bool:
+    """Check whether a (rounded) angular signature is exactly {45°, 90°}."""
+    has_90 = any(abs(theta - 90.0) < 0.1 for theta in sig)
+    return signature_has_45(sig) and has_90 and len(sig) == 2
+
+
 def has_45_degree(n: int) -> bool:
     """
     THEOREM 1: Check if n is a perfect square via 45° criterion.
     
     A number n is a perfect square ⟺ its angular signature contains 45°.
     
+    The pair (d, n/d) sits at exactly 45° iff d = n/d, so this is an
+    O(log n) integer square test (isqrt) instead of building the
+    signature. The rounded signature of angular_signature can also show
+    45.0 for a near-diagonal pair d(d+1) once d ≥ 120 (n ≥ 14520); use
+    signature_has_45(angular_signature(n)) for that rounded reading.
+    
     Parameters
     ----------
     n : int
@@ -364,15 +760,19 @@ def has_45_degree(n: int) -> bool:
     >>> has_45_degree(35)
     False
     """
-    sig = angular_signature(n)
-    return any(abs(theta - 45.0) < 0.1 for theta in sig)
+    if n <= 1:
+        return False  # empty signature
+    r = isqrt(n)
+    return r * r == n
 
 
 def is_prime_square_signature(n: int) -> bool:
     """
     THEOREM 2: Check if n is the square of a prime.
     
-    Prime squares p² have exactly the signature {45°, 90°}.
+    Prime squares p² have exactly the signature {45°, 90°}: their only
+    divisor pairs are (1, p²) and (p, p). Checked as an isqrt square test
+    plus a primality test of the root.
     
     Parameters
     ----------
@@ -391,10 +791,7 @@ def is_prime_square_signature(n: int) -> bool:
     >>> is_prime_square_signature(36)  # 6² (composite)
     False
     """
-    sig = angular_signature(n)
-    has_45 = any(abs(theta - 45.0) < 0.1 for theta in sig)
-    has_90 = any(abs(theta - 90.0) < 0.1 for theta in sig)
-    return has_45 and has_90 and len(sig) == 2
+    return has_45_degree(n) and is_prime(isqrt(n))
 
 
 def classify_by_signature(n: int) -> str:
@@ -407,6 +804,10 @@ def classify_by_signature(n: int) -> str:
     - "COMPOSITE_SQUARE": Contains 45° but more than 2 angles
     - "COMPOSITE": Neither prime nor square
     
+    Single pass without building the signature: one square test and at
+    most one primality test (of n or of √n), consistent with
+    has_45_degree and is_prime_square_signature.
+    
     Parameters
     ----------
     n : int
@@ -428,22 +829,12 @@ def classify_by_signature(n: int) -> str:
     >>> classify_by_signature(15)
     'COMPOSITE'
     """
-    sig = angular_signature(n)
-    
-    # Check for prime: only {90°} or {0°, 90°}
-    if len(sig) <= 2 and all(abs(theta - 90.0) < 0.1 or abs(theta) < 0.1 for theta in sig):
-        if is_prime(n):
-            return "PRIME"
-    
-    # Check for prime square
-    if is_prime_square_signature(n):
-        return "PRIME_SQUARE"
-    
-    # Check for composite square
-    if has_45_degree(n):
-        return "COMPOSITE_SQUARE"
-    
-    return "COMPOSITE"
+    if n <= 1:
+        return "COMPOSITE"
+    r = isqrt(n)
+    if r * r == n:
+        return "PRIME_SQUARE" if is_prime(r) else "COMPOSITE_SQUARE"
+    return "PRIME" if is_prime(n) else "COMPOSITE"
 
 
 def multiplicative_entropy(n: int) -> float:
@@ -467,8 +858,7 @@ def multiplicative_entropy(n: int) -> float:
     >>> multiplicative_entropy(4)   # Prime square, τ(4) = 3
     1.585
     """
-    t = tau(n)
-    return np.log2(t) if t > 0 else 0
+    return analyze(n).entropy
 
 
 # =============================================================================
@@ -551,36 +941,383 @@ def rsa_quality_assessment(N: int) -> Dict[str, Any]:
     >>> rsa_quality_assessment(17 * 653)   # Distant factors
     {'delta_45': 15.3, 'vulnerability': 'LOW', ...}
     """
-    d45 = delta_45(N)
-    
-    if d45 < 1.0:
-        vulnerability = "HIGH"
-        recommendation = "Factors too close - vulnerable to Fermat"
-    elif d45 < 5.0:
-        vulnerability = "MEDIUM"
-        recommendation = "Consider regenerating with more distant factors"
-    else:
-        vulnerability = "LOW"
-        recommendation = "Acceptable factor distance"
+    a = analyze(N)
+    d45 = a.delta_45
+    vulnerability, recommendation = _rsa_verdict(d45)
     
     return {
         'N': N,
         'delta_45': d45,
         'vulnerability': vulnerability,
         'recommendation': recommendation,
-        'tau': tau(N),
-        'classification': classify_by_signature(N)
+        'tau': a.tau,
+        'classification': a.classification
     }
 
 
+def _rsa_verdict(d45: float) -> Tuple[str, str]:
+    """Vulnerability level and recommendation for a δ₄₅ value."""
+    if d45 < 1.0:
+        return "HIGH", "Factors too close - vulnerable to Fermat"
+    if d45 < 5.0:
+        return "MEDIUM", "Consider regenerating with more distant factors"
+    return "LOW", "Acceptable factor distance"
+
+
+# =============================================================================
+# BATCH RSA SCANNING
+# =============================================================================
+
+def _pair_delta_45(d: int, q: int) -> float:
+    """Angular distance to 45° of the divisor pair (d, q), as in the signature."""
+    if d <= 1:
+        return 45.0
+    return abs(round(degrees(atan2(log(q), log(d))), 1) - 45.0)
+
+
+def fermat_closeness(N: int, max_iterations: int = 100_000) -> Dict[str, Any]:
+    """
+    Bounded Fermat search for the divisor pair of N closest to √N.
+    
+    Tries a = ⌈√N⌉, ⌈√N⌉+1, ... looking for a² - N = b²; the first hit
+    gives N = (a-b)(a+b), the non-trivial pair with the smallest angular
+    distance to 45°, so its δ₄₅ equals delta_45(N). Each step is a few
+    big-integer operations, so 2048-bit moduli are fine. When no pair is
+    found, every remaining pair lies beyond the last a tried, which
+    gives a lower bound on δ₄₅.
+    
+    Parameters
+    ----------
+    N : int
+        Odd modulus to test (odd N makes both factors odd, so every
+        divisor pair is a difference of squares).
+    max_iterations : int, optional
+        Number of values of a to try (default: 100000).
+        
+    Returns
+    -------
+    Dict[str, Any]
+        'factors' ((d, N/d) or None), 'iterations' (values of a tried),
+        'delta_45' (exact if factors were found, else a lower bound) and
+        'exact'.
+        
+    Examples
+    --------
+    >>> r = fermat_closeness(101 * 103)
+    >>> r['factors'], r['iterations'], r['exact']
+    ((101, 103), 1, True)
+    """
+    if N < 3 or N % 2 == 0:
+        raise ValueError("N must be odd and at least 3")
+    a = isqrt(N)
+    if a * a < N:
+        a += 1
+    for i in range(max_iterations):
+        b2 = a * a - N
+        b = isqrt(b2)
+        if b * b == b2:
+            d, q = a - b, a + b
+            return {'factors': (d, q), 'iterations': i + 1, 'delta_45': _pair_delta_45(d, q), 'exact': True}
+        a += 1
+    b = isqrt(a * a - N)
+    return {'factors': None, 'iterations': max_iterations, 'delta_45': _pair_delta_45(a - b, a + b), 'exact': False}
+
+
+def _scan_modulus(N: int, max_iterations: int) -> Dict[str, Any]:
+    """One rsa_scan record (see rsa_scan)."""
+    if N < 3 or N % 2 == 0:
+        pair = (2, N // 2) if N >= 4 and N % 2 == 0 else None
+        return {
+            'N': N,
+            'delta_45': _pair_delta_45(*pair) if pair else 45.0,
+            'vulnerability': "HIGH",
+            'recommendation': "Invalid modulus - even or smaller than 3",
+            'factors': pair,
+            'iterations': 0,
+            'exact': False,
+        }
+    r = fermat_closeness(N, max_iterations)
+    if r['exact']:
+        vulnerability, recommendation = _rsa_verdict(r['delta_45'])
+    else:
+        vulnerability = "UNKNOWN"
+        recommendation = (f"Inconclusive - not factored by {max_iterations} Fermat "
+                          f"iterations (δ₄₅ ≥ {r['delta_45']})")
+    return {'N': N, 'vulnerability': vulnerability, 'recommendation': recommendation, **r}
+
+
+def rsa_scan(moduli: Iterable[int], max_iterations: int = 100_000,
+             jobs: int = 1, batch_size: int = 256) -> Iterator[Dict[str, Any]]:
+    """
+    Assess Fermat-closeness of many RSA moduli, streaming the results.
+    
+    Unlike rsa_quality_assessment, nothing here enumerates divisors: each
+    modulus gets a bounded fermat_closeness search near isqrt(N), so
+    real 2048-bit moduli finish in time proportional to max_iterations.
+    Moduli are consumed in batches of `batch_size`, so arbitrarily long
+    streams (see src.batch_gcd.read_moduli) run in constant memory.
+    
+    Parameters
+    ----------
+    moduli : iterable of int
+        Moduli to scan.
+    max_iterations : int, optional
+        Fermat iterations per modulus (default: 100000).
+    jobs : int, optional
+        Worker processes (default: 1, in-process).
+    batch_size : int, optional
+        Moduli handed to the workers at a time (default: 256).
+        
+    Returns
+    -------
+    Iterator[Dict[str, Any]]
+        One record per modulus, in input order, with the
+        rsa_quality_assessment fields 'N', 'delta_45', 'vulnerability'
+        and 'recommendation', plus the fermat_closeness fields 'factors',
+        'iterations' and 'exact'. Without a factorization, 'delta_45' is
+        only a lower bound and the vulnerability is "UNKNOWN".
+        
+    Examples
+    --------
+    >>> [r['vulnerability'] for r in rsa_scan([101 * 103, 17 * 653])]
+    ['HIGH', 'LOW']
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from functools import partial
+    from itertools import islice
+
+    work = partial(_scan_modulus, max_iterations=max_iterations)
+    it = iter(moduli)
+    if jobs <= 1:
+        for N in it:
+            yield work(N)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        while True:
+            batch = list(islice(it, batch_size))
+            if not batch:
+                return
+            yield from pool.map(work, batch, chunksize=max(1, len(batch) // (4 * jobs)))
+
+
 # =============================================================================
 # VERIFICATION SUITE
 # =============================================================================
 
+THEOREMS = (
+    'theorem_1_45_criterion',
+    'theorem_2_prime_square',
+    'theorem_5_divisor_angle',
+)
+
+
+def signature_chunk(lo: int, hi: int) -> Dict[str, np.ndarray]:
+    """
+    Vectorized rounded signatures for every n in [lo, hi).
+    
+    All divisor pairs (d, n/d) with d ≤ √n are enumerated by striding over
+    d (O(√hi) array operations), and each angle is rounded to 0.1° as an
+    integer code (450 = 45.0°, 900 = 90.0°).
+    
+    Parameters
+    ----------
+    lo, hi : int
+        Half-open range, lo ≥ 2.
+        
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        Per-pair arrays 'pair_n', 'pair_d', 'pair_code' (grouped by d),
+        per-n arrays (index n - lo) 'pairs', 'angles' (distinct codes),
+        'has_45', 'has_90', and the signatures in flat layout: codes of
+        n = lo + i are 'sig_codes'[sig_offsets[i]:sig_offsets[i + 1]],
+        ascending.
+    """
+    size = hi - lo
+    ns_parts, ds_parts = [], []
+    for d in range(1, isqrt(hi - 1) + 1):
+        start = max(lo, d * d)
+        start = -(-start // d) * d
+        if start < hi:
+            ns_parts.append(np.arange(start, hi, d, dtype=np.int64))
+            ds_parts.append(np.full(ns_parts[-1].size, d, dtype=np.int64))
+    pair_n = np.concatenate(ns_parts) if ns_parts else np.zeros(0, dtype=np.int64)
+    pair_d = np.concatenate(ds_parts) if ds_parts else np.zeros(0, dtype=np.int64)
+
+    q = (pair_n // pair_d).astype(np.float64)
+    theta = np.degrees(np.arctan2(np.log(q), np.log(pair_d.astype(np.float64))))
+    theta[pair_d == 1] = 90.0
+    code = np.rint(theta * 10).astype(np.int16)
+
+    idx = pair_n - lo
+    keys = np.sort(idx * 1024 + code)
+    keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))] if keys.size else keys
+    angles = np.bincount(keys // 1024, minlength=size)
+    offsets = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(angles, out=offsets[1:])
+    return {
+        'pair_n': pair_n,
+        'pair_d': pair_d,
+        'pair_code': code,
+        'pairs': np.bincount(idx, minlength=size),
+        'angles': angles,
+        'sig_offsets': offsets,
+        'sig_codes': (keys % 1024).astype(np.int16),
+        'has_45': np.bincount(idx[code == 450], minlength=size) > 0,
+        'has_90': np.bincount(idx[code == 900], minlength=size) > 0,
+    }
+
+
+def _verify_chunk(bounds: Tuple[int, int], limit: int = 10) -> Dict[str, List[int]]:
+    """First counterexamples (up to `limit`) per theorem in [lo, hi)."""
+    lo, hi = bounds
+    sig = signature_chunk(lo, hi)
+    n = np.arange(lo, hi, dtype=np.int64)
+    root = np.sqrt(n).astype(np.int64)
+    root -= root * root > n
+    is_square = root * root == n
+    prime_root = np.zeros(hi - lo, dtype=bool)
+    for i in np.flatnonzero(is_square).tolist():
+        prime_root[i] = is_prime(int(root[i]))
+
+    flagged = {
+        'theorem_1_45_criterion': np.flatnonzero(is_square != sig['has_45']),
+        'theorem_2_prime_square': np.flatnonzero(
+            prime_root & ~(sig['has_45'] & sig['has_90'] & (sig['angles'] == 2))
+        ),
+        'theorem_5_divisor_angle': np.flatnonzero(np.abs(sig['pairs'] - sig['angles']) > 1),
+    }
+
+    # Confirm with the scalar signature (guards against float rounding ties)
+    out: Dict[str, List[int]] = {}
+    for name, hits in flagged.items():
+        confirmed = []
+        for i in hits.tolist():
+            m = lo + i
+            s = angular_signature(m)
+            if name == 'theorem_1_45_criterion':
+                bad = bool(is_square[i]) != signature_has_45(s)
+            elif name == 'theorem_2_prime_square':
+                bad = not signature_is_prime_square(s)
+            else:
+                bad = abs(len(get_divisor_pairs(m)) - len(s)) > 1
+            if bad:
+                confirmed.append(m)
+                if len(confirmed) >= limit:
+                    break
+        out[name] = confirmed
+    return out
+
+
+def verify_theorems_range(
+    N_max: int,
+    N_min: int = 2,
+    chunk_size: int = 100_000,
+    jobs: int = 1,
+    max_counterexamples: int = 10,
+    checkpoint: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Verify theorems 1, 2 and 5 on [N_min, N_max] in vectorized chunks.
+    
+    Chunks use signature_chunk (no per-n trial division) and can be fanned
+    out over a process pool. Results are consumed in order, so with a
+    checkpoint file the verified upper bound and counterexamples found so
+    far are saved after each chunk, and a later call with the same file
+    resumes after that bound.
+    
+    Theorem 5 is the divisor-angle correspondence (T5 in guasti_utils),
+    checked with the tolerance of test_theorems.py's
+    test_theorem_5_divisor_angle_correspondence: |pairs - angles| ≤ 1
+    (the rounded signature may merge nearby angles).
+    
+    Parameters
+    ----------
+    N_max : int
+        Upper bound (inclusive).
+    N_min : int, optional
+        Lower bound (default: 2).
+    chunk_size : int, optional
+        Integers per chunk (default: 100000).
+    jobs : int, optional
+        Worker processes (default: 1, in-process).
+    max_counterexamples : int, optional
+        Counterexamples kept per theorem (default: 10).
+    checkpoint : str, optional
+        JSON file to save progress to and resume from.
+        
+    Returns
+    -------
+    Dict[str, Any]
+        {'N_min', 'verified_upto', 'theorems': {name: {'passed': bool,
+        'counterexamples': [first n, ...]}}}.
+        
+    Examples
+    --------
+    >>> report = verify_theorems_range(20000)
+    >>> report['theorems']['theorem_1_45_criterion']['counterexamples'][:1]
+    [14520]
+    """
+    import json
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+    from functools import partial
+
+    N_min = max(N_min, 2)
+    found: Dict[str, List[int]] = {name: [] for name in THEOREMS}
+    start = N_min
+    if checkpoint and os.path.exists(checkpoint):
+        with open(checkpoint) as f:
+            state = json.load(f)
+        N_min = state['N_min']
+        found = {name: state['counterexamples'].get(name, []) for name in THEOREMS}
+        start = state['verified_upto'] + 1
+
+    def report(upto: int) -> Dict[str, Any]:
+        return {
+            'N_min': N_min,
+            'verified_upto': upto,
+            'theorems': {
+                name: {'passed': not found[name], 'counterexamples': list(found[name])}
+                for name in THEOREMS
+            },
+        }
+
+    def save(upto: int) -> None:
+        tmp = checkpoint + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'N_min': N_min, 'verified_upto': upto, 'counterexamples': found}, f)
+        os.replace(tmp, checkpoint)
+
+    bounds = [(lo, min(lo + chunk_size, N_max + 1)) for lo in range(start, N_max + 1, chunk_size)]
+    work = partial(_verify_chunk, limit=max_counterexamples)
+    upto = start - 1
+
+    def consume(results) -> None:
+        nonlocal upto
+        for (_, hi), chunk in zip(bounds, results, strict=True):
+            for name in THEOREMS:
+                room = max_counterexamples - len(found[name])
+                found[name].extend(chunk[name][:room])
+            upto = hi - 1
+            if checkpoint:
+                save(upto)
+
+    if jobs > 1 and len(bounds) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            consume(pool.map(work, bounds))
+    else:
+        consume(work(b) for b in bounds)
+    return report(upto)
+
+
 def verify_theorems(N_max: int = 200) -> Dict[str, bool]:
     """
     Verify all 9 theorems on integers from 2 to N_max.
     
+    Pass/fail summary of verify_theorems_range (see it for counterexamples,
+    parallelism and checkpoints).
+    
     Parameters
     ----------
     N_max : int, optional
@@ -591,30 +1328,8 @@ def verify_theorems(N_max: int = 200) -> Dict[str, bool]:
     Dict[str, bool]
         Dictionary with verification status for each theorem.
     """
-    results = {
-        'theorem_1_45_criterion': True,
-        'theorem_2_prime_square': True,
-        'theorem_5_divisor_angle': True,
-    }
-    
-    for n in range(2, N_max + 1):
-        sqrt_n = int(sqrt(n))
-        is_square = (sqrt_n * sqrt_n == n)
-        
-        # Theorem 1: 45° ⟺ perfect square
-        if is_square != has_45_degree(n):
-            results['theorem_1_45_criterion'] = False
-        
-        # Theorem 2: Prime squares have {45°, 90°}
-        if is_square and sqrt_n > 1 and is_prime(sqrt_n):
-            if not is_prime_square_signature(n):
-                results['theorem_2_prime_square'] = False
-        
-        # Theorem 5: τ(n) = number of angles (approximately)
-        sig = angular_signature(n)
-        # Note: Due to symmetry, actual count may differ slightly
-    
-    return results
+    report = verify_theorems_range(N_max, max_counterexamples=1)
+    return {name: r['passed'] for name, r in report['theorems'].items()}
 
 
 # =============================================================================
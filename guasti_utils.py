@@ -28,20 +28,22 @@ def generate_number_table(N_max: int = 100) -> Dict[int, Dict[str, Any]]:
         Dictionary mapping each number to its properties.
     """
     from .guasti_core import (
-        tau, sigma, is_prime, angular_signature, 
-        has_45_degree, classify_by_signature, multiplicative_entropy
+        arithmetic_tables, angular_signature,
+        has_45_degree, classify_by_signature
     )
     
+    arith = arithmetic_tables(N_max)
     table = {}
     for n in range(2, N_max + 1):
         sqrt_n = int(sqrt(n))
+        t = int(arith['tau'][n])
         table[n] = {
             'n': n,
-            'is_prime': is_prime(n),
+            'is_prime': bool(arith['is_prime'][n]),
             'is_square': sqrt_n * sqrt_n == n,
-            'tau': tau(n),
-            'sigma': sigma(n),
-            'entropy': multiplicative_entropy(n),
+            'tau': t,
+            'sigma': int(arith['sigma'][n]),
+            'entropy': np.log2(t),
             'signature': angular_signature(n),
             'has_45': has_45_degree(n),
             'classification': classify_by_signature(n)
@@ -82,6 +84,221 @@ def export_to_csv(table: Dict[int, Dict[str, Any]], filename: str) -> None:
             ])
 
 
+CLASSIFICATIONS = ("PRIME", "PRIME_SQUARE", "COMPOSITE_SQUARE", "COMPOSITE")
+
+# Fixed-width columns of the columnar table (signature uses offsets + values).
+COLUMN_DTYPES = {
+    'n': np.int64,
+    'is_prime': np.bool_,
+    'is_square': np.bool_,
+    'tau': np.int64,
+    'sigma': np.int64,
+    'entropy': np.float64,
+    'has_45': np.bool_,
+    'classification': np.uint8,
+}
+
+
+def number_columns(lo: int, hi: int) -> Dict[str, np.ndarray]:
+    """
+    Columnar Guasti properties for every n in [lo, hi).
+    
+    Same fields as generate_number_table, one NumPy array per field, all
+    derived from one vectorized divisor-pair pass (signature_chunk).
+    'classification' holds indices into CLASSIFICATIONS; signatures are
+    flat: tenths of a degree in 'sig_values', and n = lo + i owns
+    sig_values[sig_offsets[i]:sig_offsets[i + 1]] (ascending).
+    
+    Parameters
+    ----------
+    lo, hi : int
+        Half-open range, lo ≥ 2.
+        
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        The COLUMN_DTYPES columns plus 'sig_offsets' and 'sig_values'.
+    """
+    from .guasti_core import signature_chunk
+    
+    sig = signature_chunk(lo, hi)
+    n = np.arange(lo, hi, dtype=np.int64)
+    root = np.sqrt(n).astype(np.int64)
+    root -= root * root > n
+    is_square = root * root == n
+    pairs = sig['pairs']
+    tau = 2 * pairs - is_square
+    # σ(n) = Σ (d + n/d) over pairs, counting √n once (exact below 2^53)
+    pair_sum = sig['pair_d'] + sig['pair_n'] // sig['pair_d']
+    sigma = np.rint(np.bincount(sig['pair_n'] - lo, weights=pair_sum, minlength=hi - lo)).astype(np.int64)
+    sigma -= np.where(is_square, root, 0)
+    
+    is_prime = pairs == 1
+    classification = np.full(hi - lo, 3, dtype=np.uint8)
+    classification[is_prime] = 0
+    classification[is_square] = 2
+    classification[is_square & (tau == 3)] = 1
+    return {
+        'n': n,
+        'is_prime': is_prime,
+        'is_square': is_square,
+        'tau': tau,
+        'sigma': sigma,
+        'entropy': np.log2(tau),
+        'has_45': is_square,
+        'classification': classification,
+        'sig_offsets': sig['sig_offsets'],
+        'sig_values': sig['sig_codes'],
+    }
+
+
+def iter_number_columns(N_max: int, N_min: int = 2, chunk_size: int = 100_000):
+    """Yield number_columns chunks covering [N_min, N_max] in order (bounded memory)."""
+    N_min = max(N_min, 2)
+    for lo in range(N_min, N_max + 1, chunk_size):
+        yield number_columns(lo, min(lo + chunk_size, N_max + 1))
+
+
+def generate_number_columns(N_max: int = 100, chunk_size: int = 100_000) -> Dict[str, np.ndarray]:
+    """
+    Columnar version of generate_number_table for numbers 2 to N_max.
+    
+    Parameters
+    ----------
+    N_max : int
+        Maximum number to include.
+    chunk_size : int
+        Numbers processed per vectorized pass.
+        
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        See number_columns; sig_offsets are global (length N_max).
+    """
+    chunks = list(iter_number_columns(N_max, chunk_size=chunk_size))
+    if not chunks:
+        chunks = [number_columns(2, 2)]
+    out = {name: np.concatenate([c[name] for c in chunks]) for name in COLUMN_DTYPES}
+    out['sig_values'] = np.concatenate([c['sig_values'] for c in chunks])
+    offsets = [np.zeros(1, dtype=np.int64)]
+    base = 0
+    for c in chunks:
+        offsets.append(c['sig_offsets'][1:] + base)
+        base += int(c['sig_offsets'][-1])
+    out['sig_offsets'] = np.concatenate(offsets)
+    return out
+
+
+_CODE_TEXT = [f"{c / 10:.1f}" for c in range(901)]
+
+
+def _signature_text(codes: np.ndarray) -> str:
+    return "{" + ", ".join(_CODE_TEXT[c] for c in codes.tolist()) + "}"
+
+
+def export_columns_csv(N_max: int, filename: str, N_min: int = 2, chunk_size: int = 100_000) -> None:
+    """
+    Stream the number table for [N_min, N_max] to CSV, chunk by chunk.
+    
+    Same header as export_to_csv; signatures are written sorted, e.g.
+    "{45.0, 90.0}".
+    
+    Parameters
+    ----------
+    N_max : int
+        Maximum number to include.
+    filename : str
+        Output filename.
+    N_min : int
+        Minimum number to include (default: 2).
+    chunk_size : int
+        Numbers per chunk (memory bound).
+    """
+    import csv
+    
+    with open(filename, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['n', 'is_prime', 'is_square', 'tau', 'sigma',
+                        'entropy', 'has_45', 'classification', 'signature'])
+        for c in iter_number_columns(N_max, N_min, chunk_size):
+            off = c['sig_offsets']
+            vals = c['sig_values']
+            writer.writerows(
+                (n, bool(p), bool(sq), t, s, f"{h:.3f}", bool(h45), CLASSIFICATIONS[k],
+                 _signature_text(vals[off[i]:off[i + 1]]))
+                for i, (n, p, sq, t, s, h, h45, k) in enumerate(zip(
+                    c['n'].tolist(), c['is_prime'].tolist(), c['is_square'].tolist(),
+                    c['tau'].tolist(), c['sigma'].tolist(), c['entropy'].tolist(),
+                    c['has_45'].tolist(), c['classification'].tolist(), strict=True))
+            )
+
+
+def export_columns_binary(N_max: int, dirname: str, N_min: int = 2, chunk_size: int = 100_000) -> None:
+    """
+    Stream the number table for [N_min, N_max] to a compact columnar directory.
+    
+    One raw little-endian file per column (`<name>.bin`) plus `meta.json`
+    with dtypes and lengths; chunks are appended as they are computed.
+    Read back with load_columns_binary.
+    
+    Parameters
+    ----------
+    N_max : int
+        Maximum number to include.
+    dirname : str
+        Output directory (created if needed).
+    N_min : int
+        Minimum number to include (default: 2).
+    chunk_size : int
+        Numbers per chunk (memory bound).
+    """
+    import json
+    import os
+    
+    os.makedirs(dirname, exist_ok=True)
+    dtypes = dict(COLUMN_DTYPES, sig_offsets=np.int64, sig_values=np.int16)
+    files = {name: open(os.path.join(dirname, f"{name}.bin"), 'wb') for name in dtypes}
+    try:
+        rows = 0
+        base = 0
+        files['sig_offsets'].write(np.zeros(1, dtype='<i8').tobytes())
+        for c in iter_number_columns(N_max, N_min, chunk_size):
+            for name in COLUMN_DTYPES:
+                files[name].write(c[name].astype(np.dtype(dtypes[name]).newbyteorder('<')).tobytes())
+            files['sig_offsets'].write((c['sig_offsets'][1:] + base).astype('<i8').tobytes())
+            files['sig_values'].write(c['sig_values'].astype('<i2').tobytes())
+            rows += len(c['n'])
+            base += int(c['sig_offsets'][-1])
+    finally:
+        for f in files.values():
+            f.close()
+    meta = {
+        'format_version': 1,
+        'rows': rows,
+        'classifications': list(CLASSIFICATIONS),
+        'dtypes': {name: np.dtype(dt).newbyteorder('<').str for name, dt in dtypes.items()},
+        'lengths': dict({name: rows for name in COLUMN_DTYPES}, sig_offsets=rows + 1, sig_values=base),
+    }
+    with open(os.path.join(dirname, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+
+
+def load_columns_binary(dirname: str) -> Dict[str, np.ndarray]:
+    """Memory-map a directory written by export_columns_binary (read-only arrays)."""
+    import json
+    import os
+    
+    with open(os.path.join(dirname, 'meta.json')) as f:
+        meta = json.load(f)
+    out = {}
+    for name, dt in meta['dtypes'].items():
+        length = meta['lengths'][name]
+        path = os.path.join(dirname, f"{name}.bin")
+        out[name] = (np.memmap(path, dtype=np.dtype(dt), mode='r', shape=(length,))
+                     if length else np.zeros(0, dtype=np.dtype(dt)))
+    return out
+
+
 def format_signature(sig: set) -> str:
     """Format a signature set as a readable string."""
     return "{" + ", ".join(f"{a:.1f}°" for a in sorted(sig)) + "}"
@@ -1,75 +1,19 @@
 from __future__ import annotations
 
 import argparse
+import itertools
 import math
-from typing import Iterable, List, Optional, Tuple
-
-from .wheel import residues_and_gaps, gcd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple
 
+import numpy as np
 
-# --- Deterministic Miller-Rabin for 64-bit ints ---
-def _mr_pow(a: int, d: int, n: int) -> int:
-    return pow(a, d, n)
+from .factor import smallest_prime_factor
+from .output import FORMATS, write_records
+from .primality import is_prime64, is_prime64_batch
+from .sieve import base_primes, primes_between
+from .wheel import residues_and_gaps, gcd
 
-def is_prime64(n: int) -> bool:
-    """Deterministic for n < 2^64 using known bases."""
-    if n < 2:
-        return False
-    small_primes = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
-    for p in small_primes:
-        if n == p:
-            return True
-        if n % p == 0:
-            return False
-    # write n-1 = d * 2^s
-    d = n - 1
-    s = 0
-    while d % 2 == 0:
-        d //= 2
-        s += 1
-
-    # Bases valid for 64-bit determinism
-    # Ref: deterministic MR bases set (first widely used set)
-    bases = (2, 325, 9375, 28178, 450775, 9780504, 1795265022)
-
-    for a in bases:
-        if a % n == 0:
-            continue
-        x = pow(a, d, n)
-        if x == 1 or x == n - 1:
-            continue
-        witness = True
-        for _ in range(s - 1):
-            x = (x * x) % n
-            if x == n - 1:
-                witness = False
-                break
-        if witness:
-            return False
-    return True
-
-def smallest_factor(n: int, primes: List[int]) -> int:
-    if n % 2 == 0:
-        return 2
-    r = int(math.isqrt(n))
-    for p in primes:
-        if p > r:
-            break
-        if n % p == 0:
-            return p
-    return 0
-
-def primes_upto(n: int) -> List[int]:
-    if n < 2:
-        return []
-    sieve = bytearray(b"\x01") * (n + 1)
-    sieve[0:2] = b"\x00\x00"
-    for i in range(2, int(n**0.5) + 1):
-        if sieve[i]:
-            step = i
-            start = i * i
-            sieve[start:n+1:step] = b"\x00" * (((n - start) // step) + 1)
-    return [i for i in range(2, n + 1) if sieve[i]]
 
 def polarity6(n: int) -> str:
     """Return 'D' if n ≡ 1 (mod 6), 'G' if n ≡ 5 (mod 6), '-' otherwise."""
@@ -91,8 +35,11 @@ def parse_rays(s: str) -> List[int]:
     parts = [p.strip() for p in s.replace(";", ",").split(",") if p.strip()]
     return [int(x) for x in parts]
 
-def classify(n: int, rays: List[int], trial_primes: List[int]) -> Tuple[str, Optional[int]]:
-    """Return ('prime'|'composite', factor_or_None)."""
+def classify(n: int, rays: List[int], is_prime: Optional[bool] = None) -> Tuple[str, Optional[int]]:
+    """Return ('prime'|'composite', factor_or_None).
+
+    is_prime: n's primality when the caller already knows it (skips Miller-Rabin).
+    """
     if n < 2:
         return ("composite", None)
     # Fast ray check first (educational)
@@ -100,29 +47,135 @@ def classify(n: int, rays: List[int], trial_primes: List[int]) -> Tuple[str, Opt
         if p > 1 and n % p == 0:
             return ("composite", p)
     # Definitive primality
-    if is_prime64(n):
+    if is_prime64(n) if is_prime is None else is_prime:
         return ("prime", None)
-    # Optional: show smallest factor (nice for ASCII)
-    f = smallest_factor(n, trial_primes)
-    return ("composite", f if f else None)
-
-def tower(P: int, m: int, span: int, rays: List[int], max_print: int, show_polarity: bool, show_signature: bool) -> None:
+    # Optional: show smallest factor (nice for ASCII): trial division, then Pollard-Brent
+    return ("composite", smallest_prime_factor(n))
+
+# Beyond this many base primes' worth of sqrt(hi), the window sieve falls back to classify().
+SIEVE_BASE_MAX = 10**8
+
+def window_smallest_factor(lo: int, hi: int, qs: Optional[np.ndarray] = None) -> np.ndarray:
+    """spf[n - lo] for n in [lo..hi]: smallest prime factor of n, 0 for primes and n < 4.
+
+    One segmented-sieve pass over the window: primes up to the window size strike their
+    multiples with strided slices (largest first, so the smallest factor wins); larger
+    primes have at most one multiple in the window and are scattered with np.minimum.at.
+    qs: the base primes, if already computed (any superset of the primes up to sqrt(hi)).
+    """
+    size = hi - lo + 1
+    if qs is None:
+        qs = base_primes(math.isqrt(max(hi, 0)))
+    first = np.maximum(qs * qs, -(-lo // qs) * qs)  # skip q itself: start at q^2
+    large = qs > size
+    hit = large & (first <= hi)
+    spf = np.full(size, np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(spf, first[hit] - lo, qs[hit])
+    spf[spf == np.iinfo(np.int64).max] = 0
+    for q, start in zip(qs[~large][::-1].tolist(), first[~large][::-1].tolist(), strict=True):
+        spf[start - lo :: q] = q
+    return spf
+
+def classify_window(lo: int, hi: int, rays: List[int], qs: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """classify() for every n in [lo..hi] at once: (is_prime, factor), factor 0 meaning None.
+
+    Same answers as classify (first dividing ray, then primality, then smallest factor),
+    read from window_smallest_factor instead of Miller-Rabin and trial division.
+    """
+    ns = np.arange(lo, hi + 1, dtype=np.int64)
+    factor = window_smallest_factor(lo, hi, qs)
+    for p in reversed([p for p in rays if p > 1]):  # reversed: the first dividing ray wins
+        factor[ns % p == 0] = p
+    small = ns < 2
+    factor[small] = 0
+    return (factor == 0) & ~small, factor
+
+Row = Tuple[int, int, str, Optional[int]]  # (side, n, status, factor)
+
+def iter_tower(P: int, center: int, span: int, rays: List[int], first_block: int = 256, max_block: int = 1 << 16, jobs: int = 1) -> Iterator[Row]:
+    """Balconies of the window nearest to the center first (left before right), classified lazily.
+
+    Walks outward in distance bands [d0, d1) that double from first_block up to max_block;
+    each band sieves only its left and right strips, so the first rows of any span come
+    out immediately and memory stays bounded by one band. The base primes are extended
+    band by band, up to the square root of the band's own top. Bands too far out to sieve
+    are tested instead, over one process pool for the whole walk when jobs > 1.
+    """
+    wheel = residues_and_gaps(P, compact=True)
+    qs, q_max = np.zeros(0, dtype=np.int64), 1
+    pool = None
+    try:
+        d0, block = 1, first_block
+        while d0 <= span:
+            d1 = min(span + 1, d0 + block)
+            root = math.isqrt(max(center + d1 - 1, 0))
+            if root <= SIEVE_BASE_MAX:
+                if root > q_max:
+                    qs = np.concatenate((qs, primes_between(q_max + 1, root + 1)))
+                    q_max = root
+                yield from _sieved_band(wheel, center, d0, d1, rays, qs)
+            else:  # too far out to sieve: bulk trial division, Miller-Rabin, then classify composites
+                if pool is None and jobs > 1:
+                    pool = ProcessPoolExecutor(max_workers=jobs)
+                yield from _tested_band(P, center, d0, d1, rays, pool)
+            d0, block = d1, min(2 * block, max_block)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+def _sieved_band(wheel, center: int, d0: int, d1: int, rays: List[int], qs: np.ndarray) -> Iterator[Row]:
+    left_prime, left_factor = classify_window(center - d1 + 1, center - d0, rays, qs)
+    right_prime, right_factor = classify_window(center + d0, center + d1 - 1, rays, qs)
+    ds = np.arange(d0, d1, dtype=np.int64)
+    sides = np.stack((-ds, ds), axis=1).reshape(-1)  # -d then +d for each distance d
+    prime = np.stack((left_prime[::-1], right_prime), axis=1).reshape(-1)
+    factor = np.stack((left_factor[::-1], right_factor), axis=1).reshape(-1)
+    keep = wheel.gaps_for(center + sides) > 0
+    for side, p, f in zip(sides[keep].tolist(), prime[keep].tolist(), factor[keep].tolist(), strict=True):
+        yield (side, center + side, "prime" if p else "composite", f or None)
+
+def _tested_band(P: int, center: int, d0: int, d1: int, rays: List[int], pool: Optional[ProcessPoolExecutor] = None) -> Iterator[Row]:
+    ns = [n for d in range(d0, d1) for n in (center - d, center + d) if gcd(n, P) == 1]
+    if ns and 0 <= min(ns) and max(ns) < 1 << 64:
+        known_prime = is_prime64_batch(np.array(ns, dtype=np.uint64), pool=pool).tolist()
+    else:
+        known_prime = [None] * len(ns)
+    for n, is_p in zip(ns, known_prime, strict=True):
+        yield (n - center, n, *classify(n, rays=rays, is_prime=is_p))
+
+def tower_candidates(P: int, center: int, span: int, rays: List[int]) -> List[Row]:
+    """All balconies of the window, nearest to the center first (see iter_tower)."""
+    return list(iter_tower(P, center, span, rays))
+
+def verify_primes(rows: Iterable[Row]) -> None:
+    """Cross-check sieve verdicts against Miller-Rabin (raises on any disagreement)."""
+    rows = [row for row in rows if 2 <= row[1] < 1 << 64]
+    mr = is_prime64_batch(np.array([n for _, n, _, _ in rows], dtype=np.uint64))
+    for (_, n, status, f), is_p in zip(rows, mr.tolist(), strict=True):
+        if (status == "prime" and not is_p) or (status == "composite" and is_p and f != n):  # a ray equal to n reads composite
+            raise RuntimeError(f"sieve and Miller-Rabin disagree on n={n}")
+
+TOWER_FIELDS = ("side", "n", "residue", "status", "factor", "chi6", "sig5", "sig7", "sig11")
+
+def tower_record(P: int, side: int, n: int, status: str, f: Optional[int]) -> dict:
+    """One balcony as a flat record (the TOWER_FIELDS), for the machine-readable formats."""
+    s5, s7, s11 = signature_small(n)
+    return {"side": side, "n": n, "residue": n % P or P, "status": status, "factor": f,
+            "chi6": polarity6(n), "sig5": s5, "sig7": s7, "sig11": s11}
+
+def tower(P: int, m: int, span: int, rays: List[int], max_print: int, show_polarity: bool, show_signature: bool, verify: bool = False, offset: int = 0, fmt: str = "text", jobs: int = 1) -> None:
     center = P * m
-    # trial primes for factor display (sqrt(center+span))
-    trial_primes = primes_upto(int(math.isqrt(center + span)) + 1)
-
-    candidates: List[Tuple[int, int, str, Optional[int]]] = []
-    for n in range(center - span, center + span + 1):
-        if n == center:
-            continue
-        if gcd(n, P) != 1:
-            continue
-        side = n - center  # negative left, positive right
-        status, f = classify(n, rays=rays, trial_primes=trial_primes)
-        candidates.append((side, n, status, f))
-
-    # Sort by distance from center (|side|), then left before right for same |side|
-    candidates.sort(key=lambda t: (abs(t[0]), t[0]))
+    # Walk outward from the center and classify lazily: only rows [offset, offset + max_print) are computed
+    rows = itertools.islice(iter_tower(P, center, span, rays, jobs=jobs), offset, offset + max_print)
+    if fmt != "text" and not verify:  # stream records straight from the walk
+        write_records((tower_record(P, *row) for row in rows), fmt, TOWER_FIELDS)
+        return
+    candidates = list(rows)
+    if verify:
+        verify_primes(candidates)
+    if fmt != "text":
+        write_records((tower_record(P, *row) for row in candidates), fmt, TOWER_FIELDS)
+        return
 
     print(f"\nTAMIS ANGULAIRE — mod {P} — centre = {center} (= {P}×{m}) — span = ±{span}")
     print(f"Balcons (candidats): gcd(n,{P})=1  |  Rayons surveillés: {rays if rays else '—'}")
@@ -135,8 +188,6 @@ def tower(P: int, m: int, span: int, rays: List[int], max_print: int, show_polar
 
     shown = 0
     for side, n, status, f in candidates:
-        if shown >= max_print:
-            break
         if status == "prime":
             mark = "💎"
             extra = ""
@@ -164,16 +215,14 @@ def tower(P: int, m: int, span: int, rays: List[int], max_print: int, show_polar
         print("(Aucun balcon dans cette fenêtre.)")
 
 def respiration(P: int, k: int) -> None:
-    w = residues_and_gaps(P)
-    residues = w.residues
-    gaps = w.gaps
-    print(f"\nRESPIRATION — mod {P} — φ(P)={len(residues)} — gap_max={w.max_gap}")
-    kk = min(k, len(residues))
+    w = residues_and_gaps(P, compact=True)
+    print(f"\nRESPIRATION — mod {P} — φ(P)={len(w.residues)} — gap_max={w.max_gap}")
+    kk = min(k, len(w.residues))
     print("Début des résidus:")
-    print(residues[:kk])
+    print(w.residues[:kk].tolist())
     print("Début des gaps:")
-    print(gaps[:kk])
-    print(f"(Somme gaps = {sum(gaps)})")
+    print(w.gaps[:kk].tolist())
+    print(f"(Somme gaps = {int(w.gaps.sum(dtype=np.int64))})")
 
 def main() -> None:
     ap = argparse.ArgumentParser(description="ASCII 'tamis angulaire' tower visualizer (mod 30 / mod 2310 etc.).")
@@ -181,17 +230,22 @@ def main() -> None:
     ap.add_argument("--m", type=int, default=1, help="Center multiplier: center = P*m. Default 1.")
     ap.add_argument("--span", type=int, default=60, help="Half-width around center (±span). Default 60.")
     ap.add_argument("--rays", type=str, default="7,11,13,17,19,23", help="Comma-separated ray primes to flag (optional).")
-    ap.add_argument("--max-print", type=int, default=120, help="Max balconies to print. Default 120.")
+    ap.add_argument("--max-print", type=int, default=120, help="Max balconies to print (page size). Default 120.")
+    ap.add_argument("--offset", type=int, default=0, help="Skip this many balconies first (paging). Default 0.")
     ap.add_argument("--show-respiration", action="store_true", help="Also print beginning of the respiration (residues+gaps).")
     ap.add_argument("--show-polarity", action="store_true", help="Show polarity χ6 (G/D) for candidates when applicable.")
     ap.add_argument("--show-signature", action="store_true", help="Show reduced signature (mod 5,7,11) for quick annotation.")
+    ap.add_argument("--verify", action="store_true", help="Re-check printed verdicts with Miller-Rabin (is_prime64).")
     ap.add_argument("--resp-k", type=int, default=24, help="How many residues/gaps to print if --show-respiration.")
+    ap.add_argument("--jobs", type=int, default=1, help="Worker processes for the Miller-Rabin bands beyond the sieve. Default 1.")
+    ap.add_argument("--format", choices=FORMATS, default="text",
+                    help="Output format: text (default) or json/jsonl/csv records with every field (no legend, no respiration).")
     args = ap.parse_args()
 
     rays = parse_rays(args.rays)
-    if args.show_respiration:
+    if args.show_respiration and args.format == "text":
         respiration(args.P, args.resp_k)
-    tower(P=args.P, m=args.m, span=args.span, rays=rays, max_print=args.max_print, show_polarity=args.show_polarity, show_signature=args.show_signature)
+    tower(P=args.P, m=args.m, span=args.span, rays=rays, max_print=args.max_print, show_polarity=args.show_polarity, show_signature=args.show_signature, verify=args.verify, offset=args.offset, fmt=args.format, jobs=args.jobs)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+from .wheel import Wheel
+
+# Bit order follows np.packbits: flag i lives in byte i // 8 at bit 7 - i % 8, and
+# padding bits are always 0, so popcounts never need masking.
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+def popcount(bits: np.ndarray) -> int:
+    """Number of set bits in a uint8 array."""
+    if hasattr(np, "bitwise_count"):  # NumPy >= 2.0
+        return int(np.bitwise_count(bits).sum(dtype=np.int64))
+    return int(_POPCOUNT[bits].sum(dtype=np.int64))
+
+def pack_chunks(chunks: Iterable[np.ndarray], size: int) -> np.ndarray:
+    """np.packbits of the concatenation of boolean chunks (total length size), chunk by chunk."""
+    out = np.zeros(-(-size // 8), dtype=np.uint8)
+    carry = np.zeros(0, dtype=bool)
+    pos = 0  # bytes written
+    for chunk in chunks:
+        buf = np.concatenate((carry, np.asarray(chunk, dtype=bool)))
+        full = buf.size // 8 * 8
+        out[pos : pos + full // 8] = np.packbits(buf[:full])
+        pos += full // 8
+        carry = buf[full:]
+    if carry.size:
+        out[pos] = np.packbits(carry)[0]
+    return out
+
+@dataclass
+class BitMask:
+    """One bit per integer n in [lo, lo + size); indexed by n like the bool masks it replaces."""
+    lo: int
+    size: int
+    bits: np.ndarray    # uint8, ceil(size / 8) bytes
+
+    @classmethod
+    def from_bool(cls, flags: np.ndarray, lo: int = 0) -> BitMask:
+        return cls(lo=lo, size=int(flags.size), bits=np.packbits(flags))
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[np.ndarray], size: int, lo: int = 0) -> BitMask:
+        """Build from consecutive bool chunks without ever holding the unpacked range."""
+        return cls(lo=lo, size=size, bits=pack_chunks(chunks, size))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _span(self, start: Optional[int], stop: Optional[int]) -> tuple[int, int]:
+        a = self.lo if start is None else max(start, self.lo)
+        b = self.lo + self.size if stop is None else min(stop, self.lo + self.size)
+        return a - self.lo, max(a, b) - self.lo
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            if key.step not in (None, 1):
+                return self.to_bool()[key]
+            return self.to_bool(key.start, key.stop)
+        i = key - self.lo
+        if not 0 <= i < self.size:
+            raise IndexError(f"{key} outside [{self.lo}, {self.lo + self.size})")
+        return bool(self.bits[i >> 3] >> (7 - (i & 7)) & 1)
+
+    def to_bool(self, start: Optional[int] = None, stop: Optional[int] = None) -> np.ndarray:
+        """Unpacked flags for n in [start, stop) (only the covering bytes are unpacked)."""
+        a, b = self._span(start, stop)
+        flags = np.unpackbits(self.bits[a >> 3 : -(-b // 8)])
+        return flags[a & 7 : (a & 7) + b - a].astype(bool)
+
+    def count(self, start: Optional[int] = None, stop: Optional[int] = None) -> int:
+        """Number of set n in [start, stop)."""
+        a, b = self._span(start, stop)
+        if a == 0 and b == self.size:
+            return popcount(self.bits)
+        return int(np.count_nonzero(self.to_bool(a + self.lo, b + self.lo)))
+
+    def nonzero(self, start: Optional[int] = None, stop: Optional[int] = None) -> np.ndarray:
+        """The set n in [start, stop), increasing, as int64."""
+        a, b = self._span(start, stop)
+        return np.flatnonzero(self.to_bool(a + self.lo, b + self.lo)).astype(np.int64) + a + self.lo
+
+    def __iter__(self) -> Iterator[int]:
+        """Set n in increasing order, unpacked 2^20 integers at a time."""
+        for a in range(self.lo, self.lo + self.size, 1 << 20):
+            yield from self.nonzero(a, a + (1 << 20)).tolist()
+
+@dataclass
+class WheelBitMask:
+    """One bit per wheel residue: row k, column j stands for (row + k) * P + residues[j].
+
+    Integers sharing a factor with P have no bit and read as False. For P = 30 a row is
+    exactly one byte, i.e. 8 bits per 30 integers.
+    """
+    wheel: Wheel
+    row: int            # absolute row of bits[0]
+    bits: np.ndarray    # (rows, ceil(φ / 8)) uint8, the WheelSegment.packed() layout
+
+    @classmethod
+    def from_flags(cls, wheel: Wheel, row: int, flags: np.ndarray) -> WheelBitMask:
+        return cls(wheel=wheel, row=row, bits=np.packbits(flags, axis=1))
+
+    @classmethod
+    def from_segments(cls, segments: Iterable) -> WheelBitMask:
+        """Concatenate consecutive WheelSegments (src.sieve.wheel_segments) into one mask."""
+        segments = iter(segments)
+        first = next(segments)
+        parts = [first.packed()] + [seg.packed() for seg in segments]
+        return cls(wheel=first.wheel, row=first.row, bits=np.concatenate(parts))
+
+    @property
+    def lo(self) -> int:
+        return self.row * self.wheel.P
+
+    @property
+    def hi(self) -> int:
+        return (self.row + self.bits.shape[0]) * self.wheel.P
+
+    @cached_property
+    def _columns(self) -> np.ndarray:
+        """Column of each residue class mod P (-1 off the wheel)."""
+        col = np.full(self.wheel.P, -1, dtype=np.int64)
+        col[np.asarray(self.wheel.residues) % self.wheel.P] = np.arange(len(self.wheel.residues))
+        return col
+
+    def __getitem__(self, n: int) -> bool:
+        if not self.lo <= n < self.hi:
+            raise IndexError(f"{n} outside [{self.lo}, {self.hi})")
+        j = int(self._columns[n % self.wheel.P])
+        if j < 0:
+            return False
+        return bool(self.bits[n // self.wheel.P - self.row, j >> 3] >> (7 - (j & 7)) & 1)
+
+    def flags(self) -> np.ndarray:
+        """Unpacked (rows, φ) boolean table."""
+        return np.unpackbits(self.bits, axis=1, count=len(self.wheel.residues)).astype(bool)
+
+    def to_bool(self, start: Optional[int] = None, stop: Optional[int] = None) -> np.ndarray:
+        """Dense flags for every integer n in [start, stop) (False off the wheel)."""
+        P = self.wheel.P
+        a = self.lo if start is None else max(start, self.lo)
+        b = self.hi if stop is None else min(stop, self.hi)
+        if b <= a:
+            return np.zeros(0, dtype=bool)
+        r0, r1 = a // P - self.row, -(-b // P) - self.row
+        sub = WheelBitMask(self.wheel, self.row + r0, self.bits[r0:r1])
+        dense = np.zeros((r1 - r0, P), dtype=bool)
+        dense[:, np.asarray(self.wheel.residues) % P] = sub.flags()
+        return dense.reshape(-1)[a - sub.lo : b - sub.lo]
+
+    def count(self) -> int:
+        return popcount(self.bits)
+
+    def nonzero(self) -> np.ndarray:
+        """The set integers, increasing, as int64."""
+        k, j = np.nonzero(self.flags())
+        return (k + self.row) * self.wheel.P + np.asarray(self.wheel.residues, dtype=np.int64)[j]
+
+    def __iter__(self) -> Iterator[int]:
+        rows_per_step = max(1, (1 << 20) // self.wheel.P)
+        for r in range(0, self.bits.shape[0], rows_per_step):
+            yield from WheelBitMask(self.wheel, self.row + r, self.bits[r : r + rows_per_step]).nonzero().tolist()
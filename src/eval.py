@@ -2,38 +2,55 @@ from __future__ import annotations
 
 import argparse
 import math
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, Iterable, List, Sequence, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 
-from .wheel import residues_and_gaps, gcd
-from .features import build_precomp
-from .score import score_v1_no_residue, ScoreParams
-
-def candidate_mask(B: int, prime_factors: Sequence[int]) -> np.ndarray:
-    """Mask of n in [0..B] that are coprime with P (exclude multiples of prime factors)."""
-    mask = np.ones(B + 1, dtype=bool)
-    mask[:2] = False
-    mask[1] = False
-    for q in prime_factors:
-        mask[q : B + 1 : q] = False
+from .bitmask import BitMask
+from .output import FORMATS, write_records
+from .wheel import Wheel, coprime_pattern, prime_factors, residues_and_gaps, gcd, tile_pattern
+from .features import (
+    Precomp,
+    build_precomp_segment,
+    cached_precomp,
+    first_multiple_offset,
+)
+from .score import score_window, ScoreParams
+
+_TILE_MAX_PERIOD = 1 << 25  # largest coprime pattern candidate_mask tiles (32 MiB of bool)
+
+def candidate_mask(
+    B: int,
+    prime_factors: Sequence[int],
+    start: int = 0,
+    packed: bool = False,
+) -> Union[np.ndarray, BitMask]:
+    """Mask of n in [start..B] that are coprime with P (exclude multiples of prime factors).
+
+    mask[n - start] refers to n; the default start=0 gives the historical [0..B] mask.
+    The mask is one length-prod(prime_factors) coprime pattern tiled over the window
+    (strided per prime only for products above _TILE_MAX_PERIOD).
+    packed=True returns a BitMask indexed by n itself, built 2^20 integers at a time.
+    """
+    if packed:
+        step = 1 << 20
+        chunks = (candidate_mask(min(B, a + step - 1), prime_factors, start=a) for a in range(start, B + 1, step))
+        return BitMask.from_chunks(chunks, size=max(B - start + 1, 0), lo=start)
+    size = max(B - start + 1, 0)
+    if math.prod(set(prime_factors)) <= _TILE_MAX_PERIOD:
+        mask = tile_pattern(coprime_pattern(tuple(sorted(set(prime_factors)))), start, size)
+    else:
+        mask = np.ones(size, dtype=bool)
+        for q in prime_factors:
+            mask[first_multiple_offset(q, start) :: q] = False
+    mask[: max(0, 2 - start)] = False
     return mask
 
 def factorize_squarefree(P: int) -> List[int]:
     """Return distinct prime factors of P (works for squarefree primorials)."""
-    pf = []
-    x = P
-    d = 2
-    while d * d <= x:
-        if x % d == 0:
-            pf.append(d)
-            while x % d == 0:
-                x //= d
-        d += 1
-    if x > 1:
-        pf.append(x)
-    return pf
+    return prime_factors(P)
 
 def precision_at(df_is_prime: np.ndarray, ks: Sequence[int]) -> Dict[int, float]:
     out = {}
@@ -43,44 +60,201 @@ def precision_at(df_is_prime: np.ndarray, ks: Sequence[int]) -> Dict[int, float]
         out[k] = float(df_is_prime[:kk].mean()) if kk > 0 else float('nan')
     return out
 
-def run_window(P: int, A: int, B: int, w: int, ks: Sequence[int]) -> Dict[str, float]:
-    """Compute base rate and P@K for one window [A..B]."""
-    wheel = residues_and_gaps(P)
-    prime_factors = factorize_squarefree(P)
+@dataclass
+class WindowPartial:
+    """Counts plus the top-k candidates of one (chunk of a) window, best first."""
+    candidates: int
+    primes: int
+    ns: np.ndarray
+    scores: np.ndarray
+    labels: np.ndarray
+
+def select_top(ns: np.ndarray, scores: np.ndarray, labels: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Keep the k best candidates, ordered by descending score then ascending n (deterministic ties).
 
-    pre = build_precomp(B, w=w)
-    cand = candidate_mask(B, prime_factors)
+    Partial selection first (O(n)): only candidates scoring at least the k-th best score
+    are sorted.
+    """
+    if scores.size > k:
+        if k <= 0:
+            return ns[:0], scores[:0], labels[:0]
+        kth = np.partition(scores, scores.size - k)[scores.size - k]
+        keep = np.flatnonzero(scores >= kth)
+        ns, scores, labels = ns[keep], scores[keep], labels[keep]
+    order = np.lexsort((ns, -scores))[:k]
+    return ns[order], scores[order], labels[order]
 
-    scores = []
-    labels = []
-    for n in range(A, B + 1):
-        if not cand[n]:
-            continue
-        s = score_v1_no_residue(n, P=P, wheel=wheel, pre=pre)
-        scores.append(s)
-        labels.append(bool(pre.is_prime[n]))
+def merge_partials(parts: Sequence[WindowPartial], k: int) -> WindowPartial:
+    """Merge chunk results of one window; the merged top-k equals the top-k of the whole window."""
+    ns, scores, labels = select_top(
+        np.concatenate([p.ns for p in parts]),
+        np.concatenate([p.scores for p in parts]),
+        np.concatenate([p.labels for p in parts]),
+        k,
+    )
+    return WindowPartial(
+        candidates=sum(p.candidates for p in parts),
+        primes=sum(p.primes for p in parts),
+        ns=ns,
+        scores=scores,
+        labels=labels,
+    )
 
-    if not scores:
+def evaluate_chunk(
+    A: int,
+    B: int,
+    P: int,
+    wheel: Wheel,
+    prime_factors: Sequence[int],
+    w: int,
+    k: int,
+    kernel: str = "box",
+    pre: Optional[Precomp] = None,
+) -> WindowPartial:
+    """Score [A..B] and keep its top-k. Builds a segment Precomp unless one covering [A-w..B+w] is given."""
+    if B < A:  # empty window: nothing to sieve or score
+        empty = np.zeros(0, dtype=np.int64)
+        return WindowPartial(candidates=0, primes=0, ns=empty, scores=empty.astype(np.float64),
+                             labels=empty.astype(bool))
+    if pre is None:
+        pre = build_precomp_segment(A, B, w=w, kernel=kernel)
+    cand = candidate_mask(B, prime_factors, start=A)
+    ns, scores = score_window(A, B, cand, P=P, wheel=wheel, pre=pre, cand_start=A)
+    labels = pre.is_prime[ns - pre.lo]
+    top_ns, top_scores, top_labels = select_top(ns, scores, labels, k)
+    return WindowPartial(
+        candidates=int(ns.size),
+        primes=int(np.count_nonzero(labels)),
+        ns=top_ns,
+        scores=top_scores,
+        labels=top_labels,
+    )
+
+def window_metrics(part: WindowPartial, ks: Sequence[int]) -> Dict[str, float]:
+    """Base rate and P@K from a (merged) WindowPartial."""
+    if part.candidates == 0:
         return {
             "candidates": 0,
             "base_rate": float("nan"),
             **{f"P@{k}": float("nan") for k in ks},
         }
+    prec = precision_at(part.labels, ks)
+    return {
+        "candidates": part.candidates,
+        "base_rate": part.primes / part.candidates,
+        **{f"P@{k}": prec[k] for k in ks},
+    }
 
-    scores = np.asarray(scores, dtype=np.float64)
-    labels = np.asarray(labels, dtype=bool)
+def run_window(
+    P: int,
+    A: int,
+    B: int,
+    w: int,
+    ks: Sequence[int],
+    kernel: str = "box",
+    chunk_size: Optional[int] = None,
+) -> Dict[str, float]:
+    """Compute base rate and P@K for one window [A..B].
 
-    order = np.argsort(-scores)  # descending
-    labels_sorted = labels[order]
+    With chunk_size, the window is streamed chunk by chunk: memory is bounded by the
+    chunk plus the running top-max(K), and the metrics are the same as in one pass.
+    """
+    return run_windows(P, [(A, B)], w=w, ks=ks, kernel=kernel, chunk_size=chunk_size)[0]
 
-    base_rate = float(labels_sorted.mean())
-    prec = precision_at(labels_sorted, ks)
+def split_window(A: int, B: int, chunk_size: Optional[int]) -> List[Tuple[int, int]]:
+    """Split [A..B] into consecutive chunks of at most chunk_size integers (None: one chunk)."""
+    if not chunk_size or B - A + 1 <= chunk_size:
+        return [(A, B)]
+    return [(a, min(a + chunk_size - 1, B)) for a in range(A, B + 1, chunk_size)]
 
-    return {
-        "candidates": int(labels_sorted.size),
-        "base_rate": base_rate,
-        **{f"P@{k}": prec[k] for k in ks},
+# Read-only state shared with pool workers: set once per process by the initializer
+# (inherited copy-on-write under fork, pickled once per worker otherwise). With a cache
+# directory, each worker loads (or builds and saves) the Precomp of its own chunk.
+_WORKER_STATE: Dict[str, object] = {}
+
+def _init_worker(state: Dict[str, object]) -> None:
+    _WORKER_STATE.clear()
+    _WORKER_STATE.update(state)
+
+def _worker_precomp(A: int, B: int) -> Optional[Precomp]:
+    st = _WORKER_STATE
+    if st["pre"] is not None or st["cache_dir"] is None:
+        return st["pre"]
+    return cached_precomp(st["cache_dir"], B, w=st["w"], kernel=st["kernel"], A=A, mmap=True)
+
+def _evaluate_task(task: Tuple[int, int, int]) -> WindowPartial:
+    st = _WORKER_STATE
+    _, A, B = task
+    return evaluate_chunk(
+        A, B,
+        P=st["P"], wheel=st["wheel"], prime_factors=st["prime_factors"],
+        w=st["w"], k=st["k"], kernel=st["kernel"], pre=_worker_precomp(A, B),
+    )
+
+def run_windows(
+    P: int,
+    pairs: Sequence[Tuple[int, int]],
+    w: int,
+    ks: Sequence[int],
+    kernel: str = "box",
+    jobs: int = 1,
+    chunk_size: Optional[int] = None,
+    pre: Optional[Precomp] = None,
+    cache_dir: Optional[str] = None,
+) -> List[Dict[str, float]]:
+    """Evaluate several windows, optionally over a process pool; results follow the order of pairs.
+
+    The compact wheel and (if given) a shared Precomp covering every window are
+    computed once and handed to the workers. With cache_dir, each chunk's segment Precomp
+    is loaded from (or built and saved to) the on-disk cache by the worker that scores it,
+    memory-mapped; otherwise each chunk sieves its own disjoint segment. Windows are split into
+    chunk_size pieces whose top-K lists are merged, which gives the same metrics as one
+    pass over the window.
+    """
+    return list(iter_windows(P, pairs, w, ks, kernel=kernel, jobs=jobs, chunk_size=chunk_size,
+                             pre=pre, cache_dir=cache_dir))
+
+def iter_windows(
+    P: int,
+    pairs: Sequence[Tuple[int, int]],
+    w: int,
+    ks: Sequence[int],
+    kernel: str = "box",
+    jobs: int = 1,
+    chunk_size: Optional[int] = None,
+    pre: Optional[Precomp] = None,
+    cache_dir: Optional[str] = None,
+) -> Iterator[Dict[str, float]]:
+    """run_windows as a generator: each window's metrics, in order, once its last chunk is folded."""
+    wheel = residues_and_gaps(P, compact=True)
+    state = {
+        "P": P,
+        "wheel": wheel,
+        "prime_factors": factorize_squarefree(P),
+        "w": w,
+        "k": max(ks),
+        "kernel": kernel,
+        "pre": pre,
+        "cache_dir": None if cache_dir is None else str(cache_dir),
     }
+    tasks = [(i, a, b) for i, (A, B) in enumerate(pairs) for a, b in split_window(A, B, chunk_size)]
+
+    def fold(parts: Iterable[WindowPartial]) -> Iterator[Dict[str, float]]:
+        # Merge each chunk into its window's running top-K as soon as it arrives; the
+        # chunks of a window are consecutive, so a window is done when the next one starts.
+        merged: Optional[WindowPartial] = None
+        for t, ((i, _, _), part) in enumerate(zip(tasks, parts, strict=True)):
+            merged = part if merged is None else merge_partials([merged, part], max(ks))
+            if t + 1 == len(tasks) or tasks[t + 1][0] != i:
+                yield window_metrics(merged, ks)
+                merged = None
+
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(state,)) as pool:
+            yield from fold(pool.map(_evaluate_task, tasks))
+    else:
+        _init_worker(state)
+        yield from fold(_evaluate_task(t) for t in tasks)
 
 def main():
     ap = argparse.ArgumentParser(description="Guasti score v1 (P primorial) evaluation.")
@@ -88,9 +262,18 @@ def main():
     ap.add_argument("--A", type=int, default=500001, help="Window start (inclusive).")
     ap.add_argument("--B", type=int, default=1000000, help="Window end (inclusive).")
     ap.add_argument("--w", type=int, default=3, help="Neighborhood radius for sat31, default 3.")
+    ap.add_argument("--kernel", choices=["box", "triangular", "gaussian"], default="box",
+                   help="Neighborhood kernel for sat31, default box (plain mean).")
     ap.add_argument("--K", type=int, nargs="+", default=[100, 500, 1000, 5000, 20000], help="List of K for Precision@K.")
     ap.add_argument("--windows", type=int, nargs="*", default=None,
                    help="Optional list of window pairs: A1 B1 A2 B2 ... Overrides --A/--B if provided.")
+    ap.add_argument("--jobs", type=int, default=1, help="Worker processes for windows/chunks, default 1.")
+    ap.add_argument("--chunk-size", type=int, default=None,
+                   help="Stream each window in chunks of this many integers (bounded memory, merged top-K).")
+    ap.add_argument("--cache-dir", type=str, default=None,
+                   help="Directory of memory-mapped Precomp caches, reused across runs and workers.")
+    ap.add_argument("--format", choices=FORMATS, default="text",
+                   help="Output format: text (default) or one json/jsonl/csv record per window.")
     args = ap.parse_args()
 
     if args.windows:
@@ -100,9 +283,17 @@ def main():
     else:
         pairs = [(args.A, args.B)]
 
-    print(f"P={args.P}  w={args.w}  K={args.K}")
-    for (A, B) in pairs:
-        res = run_window(P=args.P, A=A, B=B, w=args.w, ks=args.K)
+    if args.format == "text":
+        print(f"P={args.P}  w={args.w}  kernel={args.kernel}  K={args.K}")
+    results = iter_windows(P=args.P, pairs=pairs, w=args.w, ks=args.K, kernel=args.kernel,
+                           jobs=args.jobs, chunk_size=args.chunk_size, cache_dir=args.cache_dir)
+    if args.format != "text":
+        fields = ["A", "B", "P", "w", "kernel", "candidates", "base_rate"] + [f"P@{k}" for k in args.K]
+        records = ({"A": A, "B": B, "P": args.P, "w": args.w, "kernel": args.kernel, **res}
+                   for (A, B), res in zip(pairs, results, strict=True))
+        write_records(records, args.format, fields)
+        return
+    for (A, B), res in zip(pairs, results, strict=True):
         head = f"[{A}-{B}] candidates={res['candidates']:,} base_rate={res['base_rate']:.6f}"
         print(head)
         for k in args.K:
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import math
+from typing import Dict, List, Tuple
+
+from .primality import is_prime64
+
+# Trial division bound before switching to Pollard-Brent rho.
+TRIAL_PRIMES: Tuple[int, ...] = (
+    2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47,
+    53, 59, 61, 67, 71, 73, 79, 83, 89, 97,
+)
+BATCH = 128  # rho steps per gcd in pollard_brent
+
+def pollard_brent(n: int) -> int:
+    """Return a non-trivial factor of the odd composite n (Pollard rho, Brent cycle finding).
+
+    |x - y| products are accumulated BATCH steps at a time so a gcd is taken once per
+    batch; a batch that overshoots to gcd == n is replayed one step at a time.
+    """
+    if n % 2 == 0:
+        return 2
+    c = 1
+    while True:
+        y, r, q, g = 2, 1, 1, 1
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(BATCH, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = math.gcd(q, n)
+                k += BATCH
+            r *= 2
+        if g == n:
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = math.gcd(abs(x - ys), n)
+        if g != n:
+            return g
+        c += 1
+
+def factorize(n: int) -> Dict[int, int]:
+    """Prime factorization {p: e} of n >= 1 (trial division by small primes, then Pollard-Brent rho).
+
+    Primality uses is_prime64: deterministic below 2^64, a strong probable-prime test above.
+    """
+    factors: Dict[int, int] = {}
+    for p in TRIAL_PRIMES:
+        if n % p == 0:
+            e = 0
+            while n % p == 0:
+                n //= p
+                e += 1
+            factors[p] = e
+    stack: List[int] = [n] if n > 1 else []
+    while stack:
+        m = stack.pop()
+        if is_prime64(m):
+            factors[m] = factors.get(m, 0) + 1
+            continue
+        r = math.isqrt(m)
+        if r * r == m:
+            stack += [r, r]
+            continue
+        d = pollard_brent(m)
+        stack += [d, m // d]
+    return dict(sorted(factors.items()))
+
+def smallest_prime_factor(n: int) -> int:
+    """Smallest prime factor of n >= 2 (n itself when prime), without a prime table up to sqrt(n)."""
+    for p in TRIAL_PRIMES:
+        if n % p == 0:
+            return p
+    if is_prime64(n):
+        return n
+    return min(factorize(n))
+
+def divisors_from_factorization(factors: Dict[int, int]) -> List[int]:
+    """All divisors of prod(p**e), sorted ascending (enumerated combinatorially)."""
+    divisors = [1]
+    for p, e in factors.items():
+        divisors = [d * p**k for d in divisors for k in range(e + 1)]
+    return sorted(divisors)
@@ -1,11 +1,30 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import math
+import os
+import shutil
+import tempfile
+
 import numpy as np
 from dataclasses import dataclass
-from typing import List, Sequence, Tuple
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
+
+from .bitmask import BitMask
+from .sieve import primes_between, wheel_segments
+
+Kernel = Union[str, Sequence[float]]
 
-def sieve_is_prime(n: int) -> np.ndarray:
-    """Boolean sieve: is_prime[x] for x in [0..n]."""
+def sieve_is_prime(n: int, packed: bool = False) -> Union[np.ndarray, BitMask]:
+    """Boolean sieve: is_prime[x] for x in [0..n].
+
+    packed=True returns a BitMask (1 bit per integer) filled from the segmented wheel
+    sieve, so the byte-per-integer array is never materialised.
+    """
+    if packed:
+        return BitMask.from_chunks(_dense_prime_chunks(n + 1), size=max(n + 1, 0))
     is_prime = np.ones(n + 1, dtype=bool)
     if n >= 0:
         is_prime[:2] = False
@@ -14,9 +33,96 @@ def sieve_is_prime(n: int) -> np.ndarray:
             is_prime[i*i : n+1 : i] = False
     return is_prime
 
+def _dense_prime_chunks(hi: int, P: int = 30):
+    """Bool is_prime chunks covering [0, hi) in order, one per wheel segment."""
+    for seg in wheel_segments(0, hi, P=P):
+        dense = np.zeros((seg.flags.shape[0], P), dtype=bool)
+        dense[:, seg.wheel.residues] = seg.flags
+        dense = dense.reshape(-1)
+        if seg.row == 0:
+            dense[[p for p in (2, 3, 5) if p < hi]] = True
+        yield dense[: hi - seg.row * P]
+
 def primes_upto(n: int) -> List[int]:
-    mask = sieve_is_prime(n)
-    return np.nonzero(mask)[0].tolist()
+    return primes_between(0, n + 1).tolist()
+
+def first_multiple_offset(p: int, lo: int, start: int | None = None) -> int:
+    """Offset (from lo) of the first multiple of p that is >= max(lo, start)."""
+    m = max(lo, p if start is None else start)
+    return -(-m // p) * p - lo
+
+def sieve_segment(lo: int, hi: int) -> np.ndarray:
+    """Boolean segmented sieve: is_prime[x - lo] for x in [lo..hi], base primes up to sqrt(hi)."""
+    is_prime = np.ones(hi - lo + 1, dtype=bool)
+    is_prime[: max(0, 2 - lo)] = False
+    for q in primes_upto(math.isqrt(hi)):
+        is_prime[first_multiple_offset(q, lo, q * q) :: q] = False
+    return is_prime
+
+def kernel_weights(kernel: Kernel, w: int) -> np.ndarray:
+    """Weights k[j + w] for offsets j in [-w..w]: 'box', 'triangular', 'gaussian' or explicit."""
+    offsets = np.arange(-w, w + 1, dtype=np.float64)
+    if isinstance(kernel, str):
+        if kernel == "box":
+            return np.ones(2 * w + 1, dtype=np.float64)
+        if kernel == "triangular":
+            return (w + 1) - np.abs(offsets)
+        if kernel == "gaussian":
+            sigma = max(w, 1) / 2.0
+            return np.exp(-0.5 * (offsets / sigma) ** 2)
+        raise ValueError(f"unknown kernel {kernel!r} (expected 'box', 'triangular' or 'gaussian')")
+    weights = np.asarray(kernel, dtype=np.float64)
+    if weights.shape != (2 * w + 1,):
+        raise ValueError(f"explicit kernel must have 2*w+1 = {2 * w + 1} weights, got {weights.shape}")
+    # every clipped support contains offset 0, so this keeps the normalising weight positive
+    if not np.isfinite(weights).all() or (weights < 0).any() or weights[w] <= 0:
+        raise ValueError("explicit kernel weights must be finite and non-negative, with a positive centre weight")
+    return weights
+
+def neighborhood_saturation(
+    counts: np.ndarray,
+    lo: int,
+    w: int,
+    clip_lo: int,
+    clip_hi: int,
+    kernel: Kernel = "box",
+) -> np.ndarray:
+    """Weighted mean of counts over n±w, restricted to [clip_lo..clip_hi].
+
+    counts[i] refers to n = lo + i. Weights are renormalised over the clipped support,
+    so the box kernel gives the plain mean; positions below clip_lo are 0.
+    """
+    size = counts.shape[0]
+    ns = np.arange(lo, lo + size, dtype=np.int64)
+    a = max(clip_lo, lo) - lo
+    b = min(clip_hi, lo + size - 1) - lo
+    out = np.zeros(size, dtype=np.float32)
+    if b < a:
+        return out
+
+    if isinstance(kernel, str) and kernel == "box":
+        prefix = np.zeros(size + 1, dtype=np.int64)
+        prefix[a + 1 : b + 2] = np.cumsum(counts[a : b + 1], dtype=np.int64)
+        prefix[b + 2 :] = prefix[b + 1]
+        n = ns[a : b + 1]
+        wlo = np.maximum(n - w, lo + a) - lo
+        whi = np.minimum(n + w, lo + b) - lo
+        out[a : b + 1] = (prefix[whi + 1] - prefix[wlo]) / (whi - wlo + 1)
+        return out
+
+    weights = kernel_weights(kernel, w)
+    m = b - a + 1
+    vals = np.zeros(m + 2 * w, dtype=np.float64)
+    valid = np.zeros(m + 2 * w, dtype=np.float64)
+    vals[w : w + m] = counts[a : b + 1]
+    valid[w : w + m] = 1.0
+    num = np.zeros(m, dtype=np.float64)
+    den = np.zeros(m, dtype=np.float64)
+    for j in range(2 * w + 1):
+        num += weights[j] * vals[j : j + m]
+        den += weights[j] * valid[j : j + m]
+    out[a : b + 1] = num / den
+    return out
 
 @dataclass
 class Precomp:
@@ -28,9 +134,12 @@ class Precomp:
     c251: np.ndarray
     sat31: np.ndarray           # neighborhood saturation (mean c31 on n±w)
     is_prime: np.ndarray        # sieve up to B
+    lo: int = 0                 # first integer covered by the arrays (index = n - lo)
+    w: int = 3                  # sat31 radius
+    kernel: Kernel = "box"      # sat31 kernel
 
-def build_precomp(B: int, w: int = 3) -> Precomp:
-    """Precompute arrays needed for fast scoring up to B."""
+def build_precomp(B: int, w: int = 3, kernel: Kernel = "box") -> Precomp:
+    """Precompute arrays needed for fast scoring up to B (kernel: see neighborhood_saturation)."""
     is_prime = sieve_is_prime(B)
     primes_251 = primes_upto(251)
 
@@ -53,15 +162,49 @@ def build_precomp(B: int, w: int = 3) -> Precomp:
         else:
             c251[p : B + 1 : p] += 1
 
-    # sat31 via prefix sums
-    prefix = np.zeros(B + 2, dtype=np.int32)
-    prefix[1:] = np.cumsum(c31, dtype=np.int32)
+    sat31 = neighborhood_saturation(c31, 0, w, clip_lo=1, clip_hi=B, kernel=kernel)
 
-    sat31 = np.zeros(B + 1, dtype=np.float32)
-    for n in range(1, B + 1):
-        lo = max(1, n - w)
-        hi = min(B, n + w)
-        sat31[n] = (prefix[hi + 1] - prefix[lo]) / (hi - lo + 1)
+    return Precomp(
+        B=B,
+        primes_251=primes_251,
+        spf_251=spf,
+        c31=c31,
+        c101=c101,
+        c251=c251,
+        sat31=sat31,
+        is_prime=is_prime,
+        w=w,
+        kernel=kernel,
+    )
+
+def build_precomp_segment(A: int, B: int, w: int = 3, kernel: Kernel = "box") -> Precomp:
+    """Precompute the scoring arrays for the window [A..B] only.
+
+    Arrays cover [max(0, A-w) .. B+w] (index = n - pre.lo), so memory scales with B - A
+    instead of B. Unlike build_precomp, sat31 is not clipped at B: every n in [A..B] sees
+    its true neighbours n±w (still clipped at 1), which makes adjacent segments agree.
+    """
+    lo = max(0, A - w)
+    hi = max(B + w, lo)  # an empty window (B < A) still gets a one-slot segment
+    size = hi - lo + 1
+    is_prime = sieve_segment(lo, hi)
+    primes_251 = primes_upto(251)
+
+    spf = np.zeros(size, dtype=np.int32)
+    c31 = np.zeros(size, dtype=np.int16)
+    c101 = np.zeros(size, dtype=np.int16)
+    c251 = np.zeros(size, dtype=np.int16)
+
+    for p in primes_251:
+        off = first_multiple_offset(p, lo)
+        spf[off::p] = np.where(spf[off::p] == 0, p, spf[off::p])
+        if p <= 31:
+            c31[off::p] += 1
+        if p <= 101:
+            c101[off::p] += 1
+        c251[off::p] += 1
+
+    sat31 = neighborhood_saturation(c31, lo, w, clip_lo=1, clip_hi=hi, kernel=kernel)
 
     return Precomp(
         B=B,
@@ -72,4 +215,103 @@ def build_precomp(B: int, w: int = 3) -> Precomp:
         c251=c251,
         sat31=sat31,
         is_prime=is_prime,
+        lo=lo,
+        w=w,
+        kernel=kernel,
     )
+
+# --- On-disk cache -----------------------------------------------------------------
+# One directory per Precomp: meta.json plus one .npy per array, reloaded with
+# np.load(mmap_mode="r") so every process maps the same page-cached files.
+
+PRECOMP_FORMAT_VERSION = 1
+PRECOMP_PRIME_BOUND = 251
+_PRECOMP_ARRAYS = ("spf_251", "c31", "c101", "c251", "sat31", "is_prime")
+
+def precomp_cache_key(A: Optional[int], B: int, w: int, kernel: Kernel = "box") -> str:
+    """Directory name for a Precomp: full build up to B (A is None) or segment [A..B]."""
+    if isinstance(kernel, str):
+        ktag = kernel
+    else:
+        digest = hashlib.sha1(np.asarray(kernel, dtype=np.float64).tobytes()).hexdigest()
+        ktag = f"k{digest[:12]}"
+    span = f"full-B{B}" if A is None else f"seg-A{A}-B{B}"
+    return f"precomp-v{PRECOMP_FORMAT_VERSION}-{span}-w{w}-{ktag}-p{PRECOMP_PRIME_BOUND}"
+
+def save_precomp(pre: Precomp, path: Union[str, Path]) -> Path:
+    """Write pre to the directory path (atomically: built next to it, then renamed)."""
+    path = Path(path)
+    tmp = Path(tempfile.mkdtemp(prefix=path.name + ".tmp-", dir=path.parent))
+    try:
+        for name in _PRECOMP_ARRAYS:
+            np.save(tmp / f"{name}.npy", np.ascontiguousarray(getattr(pre, name)))
+        meta = {
+            "format_version": PRECOMP_FORMAT_VERSION,
+            "B": pre.B,
+            "lo": pre.lo,
+            "w": pre.w,
+            "kernel": pre.kernel if isinstance(pre.kernel, str) else [float(x) for x in pre.kernel],
+            "prime_bound": PRECOMP_PRIME_BOUND,
+            "primes_251": list(pre.primes_251),
+        }
+        (tmp / "meta.json").write_text(json.dumps(meta))
+        try:
+            os.replace(tmp, path)
+        except OSError:
+            if not (path / "meta.json").exists():  # lost a race only if the winner finished
+                raise
+            shutil.rmtree(tmp, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return path
+
+def load_precomp(path: Union[str, Path], mmap: bool = True) -> Precomp:
+    """Reload a saved Precomp; with mmap=True the arrays are read-only np.memmap views (no copy)."""
+    path = Path(path)
+    meta = json.loads((path / "meta.json").read_text())
+    if meta.get("format_version") != PRECOMP_FORMAT_VERSION:
+        raise ValueError(
+            f"{path}: Precomp format v{meta.get('format_version')}, expected v{PRECOMP_FORMAT_VERSION}"
+        )
+    mode = "r" if mmap else None
+    arrays = {name: np.load(path / f"{name}.npy", mmap_mode=mode) for name in _PRECOMP_ARRAYS}
+    kernel = meta["kernel"]
+    return Precomp(
+        B=meta["B"],
+        primes_251=meta["primes_251"],
+        lo=meta["lo"],
+        w=meta["w"],
+        kernel=kernel if isinstance(kernel, str) else tuple(kernel),
+        **arrays,
+    )
+
+def ensure_cached_precomp(
+    cache_dir: Union[str, Path],
+    B: int,
+    w: int = 3,
+    kernel: Kernel = "box",
+    A: Optional[int] = None,
+) -> Path:
+    """Path of the cached Precomp for (A, B, w, kernel), building and saving it on a miss.
+
+    A=None caches build_precomp(B); otherwise build_precomp_segment(A, B).
+    """
+    cache_dir = Path(cache_dir)
+    path = cache_dir / precomp_cache_key(A, B, w, kernel)
+    if not (path / "meta.json").exists():
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        pre = build_precomp(B, w=w, kernel=kernel) if A is None else build_precomp_segment(A, B, w=w, kernel=kernel)
+        save_precomp(pre, path)
+    return path
+
+def cached_precomp(
+    cache_dir: Union[str, Path],
+    B: int,
+    w: int = 3,
+    kernel: Kernel = "box",
+    A: Optional[int] = None,
+    mmap: bool = True,
+) -> Precomp:
+    """Memory-mapped Precomp from cache_dir (see ensure_cached_precomp)."""
+    return load_precomp(ensure_cached_precomp(cache_dir, B, w=w, kernel=kernel, A=A), mmap=mmap)
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import csv
+import json
+import math
+import sys
+from typing import Dict, Iterable, Optional, Sequence, TextIO
+
+# Machine-readable CLI output: the records are written as they come, one per line
+# (jsonl, csv) or as the items of a single JSON array (json).
+FORMATS = ("text", "json", "jsonl", "csv")
+
+def _plain(value: object) -> object:
+    """NaN/inf -> None, so JSON output stays strict (null)."""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+def write_records(
+    records: Iterable[Dict[str, object]],
+    fmt: str,
+    fields: Sequence[str],
+    stream: Optional[TextIO] = None,
+) -> int:
+    """Stream dict records to stream (stdout by default) as json, jsonl or csv; returns the count.
+
+    fields fixes the csv header and column order; json/jsonl keep each record's own keys.
+    """
+    out = sys.stdout if stream is None else stream
+    count = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=list(fields), lineterminator="\n")
+        writer.writeheader()
+        for rec in records:
+            writer.writerow(rec)
+            count += 1
+    elif fmt == "jsonl":
+        for rec in records:
+            out.write(json.dumps({k: _plain(v) for k, v in rec.items()}) + "\n")
+            count += 1
+    elif fmt == "json":
+        out.write("[")
+        for rec in records:
+            out.write(("\n" if count == 0 else ",\n") + json.dumps({k: _plain(v) for k, v in rec.items()}))
+            count += 1
+        out.write("\n]\n" if count else "]\n")
+    else:
+        raise ValueError(f"unknown output format {fmt!r} (expected one of {', '.join(FORMATS[1:])})")
+    return count
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import math
 from dataclasses import dataclass
-from typing import Dict
+from typing import Dict, Tuple
 
 import numpy as np
 
@@ -24,28 +24,26 @@ def clip01(x: float) -> float:
 
 def score_v1_no_residue(n: int, P: int, wheel: Wheel, pre: Precomp, params: ScoreParams = ScoreParams()) -> float:
     """Score v1 (no residue prior). Candidate must satisfy gcd(n,P)=1 for intended use."""
-    r = n % P
-    if r == 0:
-        r = P
-    gap = wheel.gap_of_residue.get(r, 0)
+    gap = wheel.gap_of(n)
     gap_norm = gap / wheel.max_gap if wheel.max_gap else 0.0
 
-    c31 = int(pre.c31[n])
-    c101 = int(pre.c101[n])
-    c251 = int(pre.c251[n])
+    i = n - pre.lo
+    c31 = int(pre.c31[i])
+    c101 = int(pre.c101[i])
+    c251 = int(pre.c251[i])
 
     s31 = 1.0 / (1.0 + c31)
     s101 = 1.0 / (1.0 + c101)
     s251 = 1.0 / (1.0 + c251)
 
-    p = int(pre.spf_251[n])
+    p = int(pre.spf_251[i])
     if p > 0:
         theta_min = math.atan(n / (p * p))
     else:
         theta_min = math.pi / 2
     ang = theta_min / (math.pi / 2)
 
-    neigh = float(pre.sat31[n])
+    neigh = float(pre.sat31[i])
     neigh_term = clip01(neigh / params.neigh_clip_div)
 
     return (
@@ -56,3 +54,59 @@ def score_v1_no_residue(n: int, P: int, wheel: Wheel, pre: Precomp, params: Scor
         + params.w_gap * gap_norm
         - params.w_neigh * neigh_term
     )
+
+def score_v1_batch(
+    ns: np.ndarray,
+    P: int,
+    wheel: Wheel,
+    pre: Precomp,
+    params: ScoreParams = ScoreParams(),
+) -> np.ndarray:
+    """Vectorized score_v1_no_residue over an array of candidates.
+
+    Same arithmetic, in the same order, as the scalar function; only np.arctan may
+    differ from math.atan by one ulp.
+    """
+    ns = np.asarray(ns, dtype=np.int64)
+    gap = wheel.gaps_for(ns)
+    gap_norm = gap / wheel.max_gap if wheel.max_gap else np.zeros(ns.shape, dtype=np.float64)
+
+    idx = ns - pre.lo
+    s31 = 1.0 / (1.0 + pre.c31[idx].astype(np.float64))
+    s101 = 1.0 / (1.0 + pre.c101[idx].astype(np.float64))
+    s251 = 1.0 / (1.0 + pre.c251[idx].astype(np.float64))
+
+    p = pre.spf_251[idx].astype(np.int64)
+    has_p = p > 0
+    theta_min = np.full(ns.shape, math.pi / 2, dtype=np.float64)
+    theta_min[has_p] = np.arctan(ns[has_p] / (p[has_p] * p[has_p]))
+    ang = theta_min / (math.pi / 2)
+
+    neigh = pre.sat31[idx].astype(np.float64)
+    neigh_term = np.clip(neigh / params.neigh_clip_div, 0.0, 1.0)
+
+    return (
+        params.w_s31 * s31
+        + params.w_s101 * s101
+        + params.w_s251 * s251
+        + params.w_ang * ang
+        + params.w_gap * gap_norm
+        - params.w_neigh * neigh_term
+    )
+
+def score_window(
+    A: int,
+    B: int,
+    cand: np.ndarray,
+    P: int,
+    wheel: Wheel,
+    pre: Precomp,
+    params: ScoreParams = ScoreParams(),
+    cand_start: int = 0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Score every candidate n in [A..B] in one pass. Returns (ns, scores).
+
+    cand is a candidate_mask starting at cand_start (cand[n - cand_start] True for candidates).
+    """
+    ns = np.flatnonzero(cand[A - cand_start : B - cand_start + 1]).astype(np.int64) + A
+    return ns, score_v1_batch(ns, P=P, wheel=wheel, pre=pre, params=params)
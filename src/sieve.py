@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import math
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+import numpy as np
+
+from .wheel import Wheel, prime_factors, residues_and_gaps
+
+# Segments are (rows, φ(P)) boolean tables: row k covers [k*P, (k+1)*P), column j the
+# residue r_j, so only integers coprime to P are ever stored or struck. One byte per flag,
+# ~256 KiB per segment by default (L2-sized).
+DEFAULT_SEGMENT_BYTES = 1 << 18
+
+def base_primes(n: int) -> np.ndarray:
+    """All primes <= n (plain odd-only sieve, used for the sieving primes up to sqrt(hi))."""
+    if n < 2:
+        return np.zeros(0, dtype=np.int64)
+    odd = np.ones((n - 1) // 2, dtype=bool)  # odd[i] <=> 2i+3 is prime
+    for i in range((math.isqrt(n) - 1) // 2):
+        if odd[i]:
+            p = 2 * i + 3
+            odd[(p * p - 3) // 2 :: p] = False
+    return np.concatenate(([2], 2 * np.nonzero(odd)[0] + 3)).astype(np.int64)
+
+@dataclass
+class WheelSegment:
+    wheel: Wheel
+    row: int                # absolute row of flags[0] (first integer row * P)
+    flags: np.ndarray       # (rows, φ) bool: flags[k, j] <=> (row + k)*P + residues[j] is prime
+    lo: int                 # requested range [lo, hi); flags outside it are cleared
+    hi: int
+
+    def numbers(self) -> np.ndarray:
+        """(rows, φ) table of the integers behind each flag."""
+        rows = np.arange(self.row, self.row + self.flags.shape[0], dtype=np.int64)
+        return rows[:, None] * self.wheel.P + np.asarray(self.wheel.residues, dtype=np.int64)[None, :]
+
+    def primes(self) -> np.ndarray:
+        """Primes of this segment in increasing order (including the factors of P in range)."""
+        found = self.numbers()[self.flags]
+        P = self.wheel.P
+        seg_lo = max(self.lo, self.row * P)
+        seg_hi = min(self.hi, (self.row + self.flags.shape[0]) * P)
+        small = [p for p in prime_factors(P) if seg_lo <= p < seg_hi]
+        if small:
+            found = np.sort(np.concatenate((np.asarray(small, dtype=np.int64), found)))
+        return found
+
+    def packed(self) -> np.ndarray:
+        """Bit-packed flags: (rows, ceil(φ/8)) uint8, residue j at bit 7 - j % 8 of byte j // 8."""
+        return np.packbits(self.flags, axis=1)
+
+def wheel_segments(
+    lo: int,
+    hi: int,
+    P: int = 210,
+    segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+) -> Iterator[WheelSegment]:
+    """Segmented wheel sieve over [lo, hi), one WheelSegment per cache-sized block.
+
+    Memory is O(pi(sqrt(hi)) + segment_bytes). Primes below the segment height keep a
+    next-hit row per residue column: the smallest strike by one strided slice per column,
+    the others by vectorized scatters. Larger primes keep one wheel multiple each; those
+    past the segment span wait in the bucket of the segment it lands in, so a segment
+    only touches the primes that hit it.
+    """
+    wheel = residues_and_gaps(P, compact=True)
+    residues = np.asarray(wheel.residues, dtype=np.int64)
+    res_mod = residues % P  # residue classes, sorted ([0] for P = 1)
+    gaps = np.asarray(wheel.gaps, dtype=np.int64)
+    phi = residues.size
+    lo = max(lo, 0)
+    if hi <= lo:
+        return
+    first_row, end_row = (max(lo, 1) - 1) // P, -(-hi // P)  # row r holds r*P + r_j, r_0 >= 1
+    rows_per_segment = max(1, segment_bytes // phi)
+    n_segments = -(-(end_row - first_row) // rows_per_segment)
+
+    qs = base_primes(math.isqrt(hi - 1))
+    qs = qs[P % qs != 0]
+    # tiers: q < rows/16 strike by strided slices, q < rows by repeated vectorized scatters,
+    # both from next_row[i, j], the first absolute row >= first_row where row*P + r_j is a
+    # multiple of qs[i]; larger q walk their wheel multiples below
+    small = int(np.searchsorted(qs, rows_per_segment // 16))
+    mid = int(np.searchsorted(qs, rows_per_segment))
+    qm = qs[:mid]
+    inv = np.array([pow(P % q, -1, q) for q in qm.tolist()], dtype=np.int64)
+    k0 = (-residues[None, :] % qm[:, None]) * inv[:, None] % qm[:, None]
+    next_row = k0 + qm[:, None] * np.maximum(0, -((k0 - first_row) // qm[:, None]))
+    q_col = np.broadcast_to(qm[small:, None], (mid - small, phi))
+    col = np.broadcast_to(np.arange(phi), (mid - small, phi))
+
+    # larger primes walk their multiples n = q*k with k on the wheel (gcd(k, P) = 1), from q^2
+    # on (smaller multiples have a smaller factor); ki is the wheel index of k mod P. Primes
+    # below the segment span hit every segment and stay resident; the rest hit a segment at
+    # most about once and wait in the bucket of the next segment they land in
+    span = int(np.searchsorted(qs, rows_per_segment * P))
+    # the first wheel integer is first_row*P + r_0
+    kb = np.maximum(qs[mid:], -(-(first_row * P + 1) // qs[mid:]))
+    ki = np.searchsorted(res_mod, kb % P)
+    wrap = ki == phi
+    ki[wrap] = 0
+    k = kb - kb % P + res_mod[ki] + P * wrap
+    rq, rk, rki = qs[mid:span], k[: span - mid], ki[: span - mid]
+    buckets: dict[int, list[tuple[np.ndarray, np.ndarray, np.ndarray]]] = {}
+
+    def file(q: np.ndarray, k: np.ndarray, ki: np.ndarray) -> None:
+        # n = q*k is on the wheel, in row (n - 1) // P
+        seg = ((q * k - 1) // P - first_row) // rows_per_segment
+        keep = seg < n_segments
+        if not keep.any():
+            return
+        q, k, ki, seg = q[keep], k[keep], ki[keep], seg[keep]
+        order = np.argsort(seg, kind="stable")
+        q, k, ki, seg = q[order], k[order], ki[order], seg[order]
+        starts = np.flatnonzero(np.concatenate(([True], seg[1:] != seg[:-1])))
+        for a, b in zip(starts.tolist(), starts[1:].tolist() + [seg.size], strict=True):
+            buckets.setdefault(int(seg[a]), []).append((q[a:b], k[a:b], ki[a:b]))
+
+    file(qs[span:], k[span - mid :], ki[span - mid :])
+
+    for s, row in enumerate(range(first_row, end_row, rows_per_segment)):
+        rows = min(rows_per_segment, end_row - row)
+        flags = np.ones((rows, phi), dtype=bool)
+        flat = flags.reshape(-1)
+        seg_lo, seg_hi = row * P, (row + rows) * P
+
+        for i in range(small):
+            q = int(qs[i])
+            for j in range(phi):
+                off = int(next_row[i, j]) - row
+                if off < rows:
+                    flat[off * phi + j :: q * phi] = False
+                    next_row[i, j] += q * -(-(rows - off) // q)
+
+        nxt = next_row[small:]
+        while True:
+            hit = nxt < row + rows
+            if not hit.any():
+                break
+            flags[nxt[hit] - row, col[hit]] = False
+            nxt[hit] += q_col[hit]
+
+        n = rq * rk
+        while True:
+            hit = (n - 1) // P < row + rows
+            if not hit.any():
+                break
+            h = n[hit]
+            flags[(h - 1) // P - row, np.searchsorted(res_mod, h % P)] = False
+            rk[hit] += gaps[rki[hit]]
+            rki[hit] = (rki[hit] + 1) % phi
+            n = rq * rk
+
+        entries = buckets.pop(s, None)
+        if entries:
+            q, k, ki = (np.concatenate(parts) for parts in zip(*entries, strict=True))
+            while q.size:
+                n = q * k
+                here = (n - 1) // P < row + rows
+                if not here.all():
+                    file(q[~here], k[~here], ki[~here])
+                    q, k, ki, n = q[here], k[here], ki[here], n[here]
+                flags[(n - 1) // P - row, np.searchsorted(res_mod, n % P)] = False
+                k = k + gaps[ki]
+                ki = (ki + 1) % phi
+
+        q_row = (qs - 1) // P
+        in_seg = qs[(q_row >= row) & (q_row < row + rows)]
+        if in_seg.size:  # a sieving prime strikes itself; restore it
+            flags[(in_seg - 1) // P - row, np.searchsorted(res_mod, in_seg % P)] = True
+        seg = WheelSegment(wheel=wheel, row=row, flags=flags, lo=lo, hi=hi)
+        # partial first/last segment (and 1 is not prime)
+        if seg_lo + residues[0] < max(lo, 2) or seg_hi - P + residues[-1] >= hi:
+            ns = seg.numbers()
+            flags &= (ns >= max(lo, 2)) & (ns < hi)
+        yield seg
+
+def iter_primes(lo: int, hi: int, P: int = 210, segment_bytes: int = DEFAULT_SEGMENT_BYTES) -> Iterator[int]:
+    """Primes in [lo, hi), in increasing order, generated segment by segment."""
+    for seg in wheel_segments(lo, hi, P=P, segment_bytes=segment_bytes):
+        yield from seg.primes().tolist()
+
+def primes_between(lo: int, hi: int, P: int = 210, segment_bytes: int = DEFAULT_SEGMENT_BYTES) -> np.ndarray:
+    """All primes in [lo, hi) as an int64 array."""
+    parts = [seg.primes() for seg in wheel_segments(lo, hi, P=P, segment_bytes=segment_bytes)]
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
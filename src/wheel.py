@@ -1,25 +1,153 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict, List, Tuple
+import math
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
 
 def gcd(a: int, b: int) -> int:
     while b:
         a, b = b, a % b
     return a
 
+@lru_cache(maxsize=16)
+def coprime_pattern(prime_factors: Tuple[int, ...]) -> np.ndarray:
+    """Read-only coprime[r] for r in [0, prod(prime_factors)): r has none of the prime factors."""
+    period = math.prod(set(prime_factors))
+    pattern = np.ones(period, dtype=bool)
+    for q in set(prime_factors):
+        pattern[::q] = False
+    pattern.flags.writeable = False
+    return pattern
+
+def tile_pattern(pattern: np.ndarray, start: int, size: int) -> np.ndarray:
+    """pattern[n % len(pattern)] for n in [start, start + size), by copying whole periods."""
+    period = pattern.size
+    off = start % period
+    head = min(size, period - off)
+    out = np.empty(max(size, 0), dtype=pattern.dtype)
+    out[:head] = pattern[off : off + head]
+    if size > head:
+        out[head:] = np.resize(pattern, size - head)
+    return out
+
+def prime_factors(P: int) -> List[int]:
+    """Distinct prime factors of P, increasing (trial division)."""
+    pf = []
+    d = 2
+    while d * d <= P:
+        if P % d == 0:
+            pf.append(d)
+            while P % d == 0:
+                P //= d
+        d += 1
+    if P > 1:
+        pf.append(P)
+    return pf
+
+def coprime_residue_mask(P: int) -> np.ndarray:
+    """mask[r] <=> gcd(r, P) == 1 for r in [0, P): the small primes' pattern tiled, the rest struck."""
+    pf = prime_factors(P)
+    small = tuple(q for q in pf if q <= 13)
+    mask = tile_pattern(coprime_pattern(small), 0, P)
+    for q in pf[len(small):]:
+        mask[::q] = False
+    return mask
+
+class ResidueGaps(Mapping):
+    """Read-only residue -> gap mapping over the sorted residue array (binary search, no dict)."""
+
+    def __init__(self, residues: np.ndarray, gaps: np.ndarray):
+        self._residues = residues
+        self._gaps = gaps
+
+    def __getitem__(self, r: int) -> int:
+        i = int(np.searchsorted(self._residues, r))
+        if i < self._residues.size and self._residues[i] == r:
+            return int(self._gaps[i])
+        raise KeyError(r)
+
+    def __iter__(self) -> Iterator[int]:
+        return (int(r) for r in self._residues)
+
+    def __len__(self) -> int:
+        return int(self._residues.size)
+
 @dataclass(frozen=True)
 class Wheel:
     P: int
-    residues: List[int]
-    gaps: List[int]
-    gap_of_residue: Dict[int, int]
+    residues: Union[List[int], np.ndarray]
+    gaps: Union[List[int], np.ndarray]
+    gap_of_residue: Mapping[int, int]
     max_gap: int
+    # Array-backed views, indexed by n % P (filled in from residues/gaps when omitted):
+    gap_table: Optional[np.ndarray] = field(default=None, compare=False, repr=False)  # gap of n's residue, 0 if gcd(n, P) > 1
+    coprime: Optional[np.ndarray] = field(default=None, compare=False, repr=False)    # gcd(n, P) == 1
+    # Compact wheels keep only the residue/gap arrays (no length-P tables); lookups binary-search.
+    compact: bool = field(default=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if self.compact:
+            return
+        if self.gap_table is None:
+            table = np.zeros(self.P, dtype=np.int64)
+            table[np.asarray(self.residues, dtype=np.int64) % self.P] = self.gaps
+            table.flags.writeable = False
+            object.__setattr__(self, "gap_table", table)
+        if self.coprime is None:
+            mask = self.gap_table > 0
+            mask.flags.writeable = False
+            object.__setattr__(self, "coprime", mask)
+
+    def gaps_for(self, ns: np.ndarray) -> np.ndarray:
+        """Gap after the residue of each n (0 where gcd(n, P) > 1)."""
+        r = np.asarray(ns, dtype=np.int64) % self.P
+        if self.gap_table is not None:
+            return self.gap_table[r]
+        residues = np.asarray(self.residues) % self.P if self.P == 1 else np.asarray(self.residues)
+        idx = np.minimum(np.searchsorted(residues, r), residues.size - 1)
+        return np.where(residues[idx] == r, np.asarray(self.gaps)[idx], 0).astype(np.int64)
+
+    def gap_of(self, n: int) -> int:
+        """Gap after the residue of n (0 where gcd(n, P) > 1)."""
+        if self.gap_table is not None:
+            return int(self.gap_table[n % self.P])
+        return int(self.gaps_for(np.array([n]))[0])
+
+    def coprime_mask(self, start: int, stop: int) -> np.ndarray:
+        """mask[n - start] <=> gcd(n, P) == 1, for n in [start, stop), tiled from one period."""
+        if self.coprime is None:
+            return self.gaps_for(np.arange(start, stop, dtype=np.int64)) > 0
+        return tile_pattern(self.coprime, start, stop - start)
+
+def residues_and_gaps(P: int, compact: bool = False) -> Wheel:
+    """Compute the wheel residues R(P) = {1..P : gcd(r,P)=1} and the cyclic gaps G(P).
 
-def residues_and_gaps(P: int) -> Wheel:
-    """Compute the wheel residues R(P) = {1..P : gcd(r,P)=1} and the cyclic gaps G(P)."""
-    residues = [r for r in range(1, P + 1) if gcd(r, P) == 1]
-    gaps = [residues[i + 1] - residues[i] for i in range(len(residues) - 1)]
-    gaps.append(P + residues[0] - residues[-1])
-    gap_of_residue = {residues[i]: gaps[i] for i in range(len(residues))}
-    return Wheel(P=P, residues=residues, gaps=gaps, gap_of_residue=gap_of_residue, max_gap=max(gaps))
+    Residues come from a NumPy coprime mask (prime factors of P struck out), gaps from
+    np.diff. compact=True returns uint32 residues, uint16 gaps and an array-backed
+    gap_of_residue, without the length-P tables (e.g. P = 23# in well under a second).
+    """
+    mask = coprime_residue_mask(P)
+    residues = np.flatnonzero(mask)
+    if residues[0] == 0:  # only for P = 1, whose single residue is written P
+        residues[0] = P
+    gaps = np.empty_like(residues)
+    gaps[:-1] = np.diff(residues)
+    gaps[-1] = P + residues[0] - residues[-1]
+    max_gap = int(gaps.max())
+    if compact:
+        residues = residues.astype(np.uint32 if P < 1 << 32 else np.uint64)
+        gaps = gaps.astype(np.uint16 if max_gap < 1 << 16 else np.uint32)
+        return Wheel(P=P, residues=residues, gaps=gaps, gap_of_residue=ResidueGaps(residues, gaps),
+                     max_gap=max_gap, compact=True)
+    table = np.zeros(P, dtype=np.int64)
+    table[residues % P] = gaps
+    table.flags.writeable = False
+    mask.flags.writeable = False
+    res_list, gap_list = residues.tolist(), gaps.tolist()
+    return Wheel(P=P, residues=res_list, gaps=gap_list, gap_of_residue=dict(zip(res_list, gap_list, strict=True)),
+                 max_gap=max_gap, gap_table=table, coprime=mask)
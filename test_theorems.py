@@ -125,6 +125,273 @@ def test_factorization_density():
     return True
 
 
+def test_arithmetic_tables_match_scalar():
+    """
+    Sieve-backed range tables agree with the scalar functions.
+    """
+    from src.guasti_core import (
+        arithmetic_tables, precompute_tables, clear_tables,
+        tau, sigma, is_prime, factorization_density, get_divisors
+    )
+    
+    N = 2000
+    tables = arithmetic_tables(N)
+    for n in range(1, N + 1):
+        assert tables['tau'][n] == tau(n), f"FAIL: tau({n})"
+        assert tables['sigma'][n] == sigma(n), f"FAIL: sigma({n})"
+        assert tables['is_prime'][n] == is_prime(n), f"FAIL: is_prime({n})"
+        assert tables['df'][n] == factorization_density(n), f"FAIL: DF({n})"
+    
+    precompute_tables(N)
+    try:
+        assert get_divisors(360) == [1, 2, 3, 4, 5, 6, 8, 9, 10, 12, 15, 18, 20, 24,
+                                     30, 36, 40, 45, 60, 72, 90, 120, 180, 360]
+        assert tau(N + 1) == len(get_divisors(N + 1))  # beyond the tables
+    finally:
+        clear_tables()
+    
+    print("✓ Arithmetic tables: PASSED")
+    return True
+
+
+def test_signature_from_factorization():
+    """
+    Divisor pairs enumerated from the factorization match trial division.
+    """
+    from src.guasti_core import get_divisor_pairs, angular_signature, prime_factorization
+    
+    for n in range(1, 3000):
+        brute = [(d, n // d) for d in range(1, int(sqrt(n)) + 1) if n % d == 0]
+        assert get_divisor_pairs(n) == brute, f"FAIL: pairs of {n}"
+    
+    # 10^12 scale: two 6-digit primes, no √n loop needed
+    n = 999983 * 1000003
+    assert prime_factorization(n) == {999983: 1, 1000003: 1}
+    assert get_divisor_pairs(n) == [(1, n), (999983, 1000003)]
+    assert angular_signature(n) == {90.0, 45.0}
+    
+    print("✓ Signature from factorization: PASSED")
+    return True
+
+
+def test_guasti_transform_array():
+    """
+    The columnar transform matches the scalar transform element by element.
+    """
+    import numpy as np
+    from src.guasti_core import guasti_transform
+    
+    ns = np.arange(-2, 2000)
+    cols = guasti_transform(ns, N_max=500)
+    for key in ('r', 'theta', 'theta_rad', 'x', 'y'):
+        assert cols[key].shape == ns.shape
+    for i, n in enumerate(ns.tolist()):
+        ref = guasti_transform(n, N_max=500)
+        for key in ('r', 'theta', 'x', 'y'):
+            assert abs(cols[key][i] - ref[key]) < 1e-9, f"FAIL: {key} for n={n}"
+    
+    print("✓ Array-valued transform: PASSED")
+    return True
+
+
+def test_fast_paths_agree_with_signature():
+    """
+    The isqrt fast paths agree with the signature-based definitions
+    wherever the 0.1° rounding keeps near-diagonal pairs apart.
+    """
+    from src.guasti_core import (
+        angular_signature, has_45_degree, is_prime_square_signature,
+        classify_by_signature, signature_has_45, signature_is_prime_square
+    )
+    
+    for n in range(1, 14520):
+        sig = angular_signature(n)
+        assert has_45_degree(n) == signature_has_45(sig), f"FAIL: has_45_degree({n})"
+        assert is_prime_square_signature(n) == signature_is_prime_square(sig), \
+            f"FAIL: is_prime_square_signature({n})"
+    
+    # 14520 = 120 × 121: the rounded signature shows 45.0, the exact angle does not
+    assert signature_has_45(angular_signature(14520))
+    assert not has_45_degree(14520)
+    assert classify_by_signature(14520) == "COMPOSITE"
+    assert classify_by_signature(1000003 ** 2) == "PRIME_SQUARE"
+    
+    print("✓ Fast paths vs signature: PASSED")
+    return True
+
+
+def test_verification_engine():
+    """
+    The chunked verification engine reports the first counterexamples,
+    matches a scalar scan, and resumes from a checkpoint.
+    """
+    import os
+    import tempfile
+    from src.guasti_core import (
+        verify_theorems_range, angular_signature, signature_has_45, get_divisor_pairs
+    )
+    
+    report = verify_theorems_range(20000, chunk_size=3000, jobs=2)
+    t1 = report['theorems']['theorem_1_45_criterion']
+    assert report['verified_upto'] == 20000
+    assert not t1['passed'] and t1['counterexamples'][:2] == [14520, 14762]
+    assert report['theorems']['theorem_2_prime_square']['passed']
+    
+    expected = [n for n in range(2, 20001)
+                if (int(sqrt(n)) ** 2 == n) != signature_has_45(angular_signature(n))][:10]
+    assert t1['counterexamples'] == expected
+    assert all(abs(len(get_divisor_pairs(n)) - len(angular_signature(n))) <= 1
+               for n in range(2, 20001))
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        ckpt = os.path.join(tmp, 'verify.json')
+        verify_theorems_range(9000, chunk_size=3000, checkpoint=ckpt)
+        resumed = verify_theorems_range(20000, chunk_size=3000, checkpoint=ckpt)
+    assert resumed == verify_theorems_range(20000, chunk_size=3000)
+    
+    print("✓ Verification engine: PASSED")
+    return True
+
+
+def test_columnar_number_table():
+    """
+    The columnar table and its binary export match generate_number_table.
+    """
+    import os
+    import tempfile
+    from src.guasti_utils import (
+        generate_number_table, generate_number_columns, export_columns_binary,
+        load_columns_binary, CLASSIFICATIONS
+    )
+    
+    N = 3000
+    table = generate_number_table(N)
+    cols = generate_number_columns(N, chunk_size=700)
+    off, vals = cols['sig_offsets'], cols['sig_values']
+    for i, n in enumerate(range(2, N + 1)):
+        row = table[n]
+        assert cols['n'][i] == n
+        for key in ('is_prime', 'is_square', 'tau', 'sigma', 'has_45'):
+            assert cols[key][i] == row[key], f"FAIL: {key}({n})"
+        assert CLASSIFICATIONS[cols['classification'][i]] == row['classification']
+        assert [v / 10 for v in vals[off[i]:off[i + 1]].tolist()] == sorted(row['signature'])
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        export_columns_binary(N, os.path.join(tmp, 'table'), chunk_size=700)
+        loaded = load_columns_binary(os.path.join(tmp, 'table'))
+        for key, col in cols.items():
+            assert (loaded[key] == col).all(), f"FAIL: binary column {key}"
+    
+    print("✓ Columnar number table: PASSED")
+    return True
+
+
+def test_memoization_cache():
+    """
+    The opt-in LRU cache is bounded, counts hits/misses and does not
+    change results.
+    """
+    from src.guasti_core import (
+        enable_cache, disable_cache, cache_info, angular_signature,
+        rsa_quality_assessment, get_divisor_pairs
+    )
+    
+    N = 101 * 103
+    expected = rsa_quality_assessment(N)
+    assert cache_info() is None
+    enable_cache(maxsize=8)
+    try:
+        assert rsa_quality_assessment(N) == expected
+        misses = cache_info()['misses']
+        assert rsa_quality_assessment(N) == expected
+        assert cache_info()['misses'] == misses  # second call served from cache
+        
+        for n in range(2, 50):
+            assert get_divisor_pairs(n) == [(d, n // d) for d in range(1, int(sqrt(n)) + 1) if n % d == 0]
+        info = cache_info()
+        assert info['size'] == info['maxsize'] == 8
+        
+        sig = angular_signature(36)
+        sig.add(1.0)  # callers get copies
+        assert 1.0 not in angular_signature(36)
+        
+        enable_cache(maxsize=8)  # reset the statistics
+        angular_signature(30)
+        angular_signature(30)
+        info = cache_info()
+        assert (info['misses'], info['hits']) == (1, 1)  # one lookup per call
+    finally:
+        disable_cache()
+    
+    print("✓ Memoization cache: PASSED")
+    return True
+
+
+def test_analyzed_number():
+    """
+    AnalyzedNumber factors once and matches the free functions, which
+    now wrap it.
+    """
+    from src.guasti_core import (
+        analyze, enable_cache, disable_cache, tau, sigma, get_divisors,
+        factorization_density, angular_signature, classify_by_signature
+    )
+    
+    for n in range(-2, 300):
+        a = analyze(n)
+        divs = [d for d in range(1, n + 1) if n % d == 0]
+        assert list(a.divisors) == divs == get_divisors(n)
+        assert a.tau == len(divs) == tau(n)
+        assert a.sigma == sum(divs) == sigma(n)
+        assert a.df == factorization_density(n)
+        assert set(a.signature) == angular_signature(n)
+        assert a.classification == classify_by_signature(n)
+    
+    assert analyze(360).df == 6 and analyze(17).df == 0
+    assert analyze(100).transform(N_max=1000)['r'] == 10.0
+    
+    enable_cache(maxsize=4)
+    try:
+        assert analyze(101 * 103) is analyze(101 * 103)
+    finally:
+        disable_cache()
+    assert analyze(36) is not analyze(36)
+    
+    print("✓ AnalyzedNumber: PASSED")
+    return True
+
+
+def test_rsa_scan():
+    """
+    The bounded Fermat scanner agrees with rsa_quality_assessment when it
+    finds the closest pair, and stays cheap on large moduli.
+    """
+    import io
+    from src.batch_gcd import read_moduli
+    from src.guasti_core import rsa_scan, rsa_quality_assessment, delta_45
+    
+    moduli = [101 * 103, 17 * 653, 3 * 5 * 7 * 11 * 13, 97] + list(range(3, 400, 2))
+    for r in rsa_scan(moduli, max_iterations=10**6):
+        expected = rsa_quality_assessment(r['N'])
+        assert r['exact']
+        assert abs(r['delta_45'] - expected['delta_45']) < 1e-9
+        assert r['vulnerability'] == expected['vulnerability']
+        assert r['recommendation'] == expected['recommendation']
+    
+    for r in rsa_scan(range(3, 400, 2), max_iterations=3):
+        assert r['delta_45'] <= delta_45(r['N']) + 1e-9  # lower bound when not exact
+        assert r['exact'] or r['vulnerability'] == "UNKNOWN"
+    
+    p, q = 2**127 - 1, 2**127 + 29  # two primes 30 apart: found on the first Fermat step
+    stream = io.StringIO(f"# moduli\n{hex(p * q)}\n\n{101 * 103}\n")
+    results = list(rsa_scan(read_moduli(stream), max_iterations=1000, jobs=2, batch_size=1))
+    assert [r['N'] for r in results] == [p * q, 101 * 103]
+    assert results[0]['factors'] == (p, q) and results[0]['vulnerability'] == "HIGH"
+    
+    print("✓ Batch RSA scan: PASSED")
+    return True
+
+
 def run_all_tests():
     """Run all theorem tests."""
     print("=" * 60)
@@ -164,6 +431,60 @@ def run_all_tests():
         print(f"✗ Factorization density: FAILED - {e}")
         all_passed = False
     
+    try:
+        test_arithmetic_tables_match_scalar()
+    except AssertionError as e:
+        print(f"✗ Arithmetic tables: FAILED - {e}")
+        all_passed = False
+    
+    try:
+        test_signature_from_factorization()
+    except AssertionError as e:
+        print(f"✗ Signature from factorization: FAILED - {e}")
+        all_passed = False
+    
+    try:
+        test_guasti_transform_array()
+    except AssertionError as e:
+        print(f"✗ Array-valued transform: FAILED - {e}")
+        all_passed = False
+    
+    try:
+        test_fast_paths_agree_with_signature()
+    except AssertionError as e:
+        print(f"✗ Fast paths vs signature: FAILED - {e}")
+        all_passed = False
+    
+    try:
+        test_verification_engine()
+    except AssertionError as e:
+        print(f"✗ Verification engine: FAILED - {e}")
+        all_passed = False
+    
+    try:
+        test_columnar_number_table()
+    except AssertionError as e:
+        print(f"✗ Columnar number table: FAILED - {e}")
+        all_passed = False
+    
+    try:
+        test_memoization_cache()
+    except AssertionError as e:
+        print(f"✗ Memoization cache: FAILED - {e}")
+        all_passed = False
+    
+    try:
+        test_analyzed_number()
+    except AssertionError as e:
+        print(f"✗ AnalyzedNumber: FAILED - {e}")
+        all_passed = False
+    
+    try:
+        test_rsa_scan()
+    except AssertionError as e:
+        print(f"✗ Batch RSA scan: FAILED - {e}")
+        all_passed = False
+    
     print()
     print("=" * 60)
     if all_passed:
@@ -1,10 +1,21 @@
 # tests/test_invariants.py
 import math
 
+import numpy as np
 import pytest
 
 from src.wheel import gcd, residues_and_gaps
-from src.eval import factorize_squarefree, candidate_mask, run_window
+from src.eval import factorize_squarefree, candidate_mask, run_window, run_windows
+from src.features import (
+    build_precomp,
+    build_precomp_segment,
+    cached_precomp,
+    load_precomp,
+    neighborhood_saturation,
+    save_precomp,
+)
+from src.score import ScoreParams, score_v1_no_residue, score_window
+from src.sieve import iter_primes, primes_between, wheel_segments
 
 
 @pytest.mark.parametrize("P", [30, 210, 2310])
@@ -87,3 +98,357 @@ def test_run_window_smoke_small():
     assert math.isfinite(res["base_rate"])
     assert math.isfinite(res["P@100"])
     assert math.isfinite(res["P@500"])
+
+
+def test_run_window_empty_window():
+    # A > B + 2w : fenêtre vide, pas de segment négatif
+    res = run_window(30, 100, 50, 3, [10])
+    assert res["candidates"] == 0 and math.isnan(res["base_rate"]) and math.isnan(res["P@10"])
+    assert build_precomp_segment(100, 50, w=3).is_prime.size == 1
+
+
+def test_score_window_matches_scalar():
+    P = 2310
+    B = 20000
+    wheel = residues_and_gaps(P)
+    pre = build_precomp(B)
+    cand = candidate_mask(B, factorize_squarefree(P))
+    params = ScoreParams(w_gap=0.10, neigh_clip_div=2.0)
+
+    ns, scores = score_window(1000, B, cand, P=P, wheel=wheel, pre=pre, params=params)
+    assert ns.size == int(cand[1000:].sum())
+    expected = [score_v1_no_residue(int(n), P=P, wheel=wheel, pre=pre, params=params) for n in ns]
+    assert np.allclose(scores, expected, rtol=0.0, atol=1e-12)
+
+
+def test_precomp_segment_matches_full_build():
+    B = 30000
+    w = 3
+    full = build_precomp(B, w=w)
+    for A, hi in [(0, 500), (12345, 20000)]:
+        seg = build_precomp_segment(A, hi, w=w)
+        assert seg.lo == max(0, A - w)
+        sl = slice(seg.lo, hi + w + 1)
+        for field in ("spf_251", "c31", "c101", "c251", "is_prime"):
+            assert np.array_equal(getattr(seg, field), getattr(full, field)[sl])
+        # sat31 agrees wherever the full build is not clipped at B
+        assert np.array_equal(seg.sat31[A - seg.lo : hi - seg.lo + 1], full.sat31[A : hi + 1])
+
+    assert np.array_equal(candidate_mask(B, [2, 3, 5, 7, 11], start=777), candidate_mask(B, [2, 3, 5, 7, 11])[777:])
+
+
+@pytest.mark.parametrize("kernel", ["box", "triangular", [1.0, 0.0, 2.0, 0.0, 1.0]])
+def test_neighborhood_saturation_matches_naive(kernel):
+    rng = np.random.default_rng(0)
+    counts = rng.integers(0, 5, size=40).astype(np.int16)
+    w = 2
+    weights = np.ones(5) if kernel == "box" else (
+        np.array([1.0, 2.0, 3.0, 2.0, 1.0]) if kernel == "triangular" else np.asarray(kernel)
+    )
+    got = neighborhood_saturation(counts, 0, w, clip_lo=1, clip_hi=39, kernel=kernel)
+    assert got[0] == 0.0
+    for n in range(1, 40):
+        js = [j for j in range(-w, w + 1) if 1 <= n + j <= 39]
+        num = sum(weights[j + w] * counts[n + j] for j in js)
+        den = sum(weights[j + w] for j in js)
+        assert got[n] == pytest.approx(num / den, rel=1e-6)
+
+
+@pytest.mark.parametrize("kernel", [[1.0, 1.0, 0.0, 1.0, 1.0], [0.0] * 5, [1.0, -1.0, 1.0, -1.0, 1.0], [1.0, np.nan, 1.0, 1.0, 1.0]])
+def test_neighborhood_saturation_rejects_degenerate_kernels(kernel):
+    with pytest.raises(ValueError):
+        neighborhood_saturation(np.ones(20, dtype=np.int64), 0, 2, clip_lo=1, clip_hi=19, kernel=kernel)
+
+
+def test_run_windows_chunked_parallel_matches_run_window():
+    pairs = [(1000, 9000), (20000, 31000)]
+    ks = [10, 100, 1000]
+    expected = [run_window(P=210, A=A, B=B, w=3, ks=ks) for A, B in pairs]
+    assert run_windows(P=210, pairs=pairs, w=3, ks=ks) == expected
+    assert run_windows(P=210, pairs=pairs, w=3, ks=ks, jobs=2, chunk_size=1700) == expected
+
+
+def test_iter_windows_yields_each_window_when_done(monkeypatch):
+    import src.eval as ev
+
+    pairs = [(1000, 9000), (20000, 31000)]
+    expected = run_windows(P=210, pairs=pairs, w=3, ks=[10])
+    seen = []
+    task = ev._evaluate_task
+    monkeypatch.setattr(ev, "_evaluate_task", lambda t: seen.append(t) or task(t))
+    windows = ev.iter_windows(P=210, pairs=pairs, w=3, ks=[10], chunk_size=3000)
+    assert next(windows) == expected[0]
+    assert {i for i, _, _ in seen} == {0}  # the second window is not scored yet
+    assert list(windows) == expected[1:]
+
+
+def test_precomp_cache_roundtrip_is_memory_mapped(tmp_path):
+    pre = build_precomp_segment(5000, 9000, w=2, kernel="triangular")
+    loaded = load_precomp(save_precomp(pre, tmp_path / "seg"))
+    assert (loaded.B, loaded.lo, loaded.w, loaded.kernel) == (9000, 4998, 2, "triangular")
+    for field in ("spf_251", "c31", "c101", "c251", "sat31", "is_prime"):
+        arr = getattr(loaded, field)
+        assert isinstance(arr, np.memmap)
+        assert np.array_equal(arr, getattr(pre, field))
+
+    cached_precomp(tmp_path / "cache", 3000, w=3)
+    again = cached_precomp(tmp_path / "cache", 3000, w=3)
+    assert np.array_equal(again.sat31, build_precomp(3000, w=3).sat31)
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+
+    pairs, ks = [(1000, 9000), (20000, 31000)], [10, 100]
+    expected = run_windows(P=210, pairs=pairs, w=3, ks=ks, chunk_size=3000)
+    for _ in range(2):  # build the chunk caches in the workers, then reuse them
+        assert run_windows(P=210, pairs=pairs, w=3, ks=ks, jobs=2, chunk_size=3000, cache_dir=tmp_path / "chunks") == expected
+    assert len(list((tmp_path / "chunks").iterdir())) == 3 + 4
+
+
+def test_run_window_streaming_matches_single_pass():
+    ks = [1, 50, 400, 10**6]
+    single = run_window(P=2310, A=100000, B=160000, w=3, ks=ks)
+    streamed = run_window(P=2310, A=100000, B=160000, w=3, ks=ks, chunk_size=4096)
+    assert streamed == single
+    assert single["P@1000000"] == pytest.approx(single["base_rate"])
+
+
+def test_factorize_pollard_rho():
+    from src.factor import divisors_from_factorization, factorize
+
+    for n in range(1, 2000):
+        f = factorize(n)
+        assert math.prod(p**e for p, e in f.items()) == n
+        assert divisors_from_factorization(f) == [d for d in range(1, n + 1) if n % d == 0]
+    assert factorize(1000003 * 1000033 * 49) == {7: 2, 1000003: 1, 1000033: 1}
+    assert factorize(2**61 - 1) == {2**61 - 1: 1}
+
+
+def test_smallest_prime_factor_at_64_bits():
+    from src.factor import factorize, smallest_prime_factor
+
+    p, q = 999999937, 1000000007
+    assert factorize(p * q) == {p: 1, q: 1}
+    assert factorize(p**2 * 101**3) == {101: 3, p: 2}
+    assert smallest_prime_factor(p * q) == p
+    assert smallest_prime_factor(q) == q
+    assert [smallest_prime_factor(n) for n in range(2, 400)] == [
+        next(d for d in range(2, n + 1) if n % d == 0) for n in range(2, 400)]
+
+
+def test_batch_gcd_finds_every_shared_pair(monkeypatch):
+    import random
+
+    from src.ascii_tower import is_prime64
+    from src.batch_gcd import batch_gcd, fast_mod, shared_factors
+
+    rng = random.Random(7)
+
+    def prime(bits):
+        while True:
+            p = rng.getrandbits(bits) | 1 | (1 << (bits - 1))
+            if is_prime64(p):
+                return p
+
+    primes = [prime(62) for _ in range(400)]
+    moduli = [primes[2 * i] * primes[2 * i + 1] for i in range(200)]
+    moduli[17] = primes[40] * prime(62)     # shares primes[40] with moduli[20]
+    moduli[150] = primes[41] * primes[301]  # shares primes[41] with moduli[20]
+    moduli[199] = moduli[3]                 # duplicate modulus
+
+    expected = [
+        (i, j, math.gcd(moduli[i], moduli[j]))
+        for i in range(len(moduli))
+        for j in range(i + 1, len(moduli))
+        if math.gcd(moduli[i], moduli[j]) > 1
+    ]
+    for jobs in (1, 2):
+        assert [(s.i, s.j, s.factor) for s in shared_factors(moduli, jobs=jobs)] == expected
+    monkeypatch.setattr("src.batch_gcd._mpz", None)  # plain-int trees when gmpy2 is installed
+    assert [(s.i, s.j, s.factor) for s in shared_factors(moduli)] == expected
+    assert [g > 1 for g in batch_gcd(moduli)] == [any(i in e[:2] for e in expected) for i in range(200)]
+
+    a, b = rng.getrandbits(60000), rng.getrandbits(25000) | 1
+    assert fast_mod(a, b) == a % b
+
+
+@pytest.mark.parametrize("P", [1, 2, 30, 210, 2310])
+def test_wheel_sieve_matches_plain_sieve(P: int):
+    from src.features import sieve_is_prime
+
+    ref = np.nonzero(sieve_is_prime(120000))[0]
+    cases = [
+        (0, 120001, 1 << 18), (0, 100, 64), (97, 98, 64), (54321, 119999, 4096),
+        (2, 3, 64), (3, 12, 1), (60000, 120000, 16),
+    ]
+    for lo, hi, segment_bytes in cases:
+        got = primes_between(lo, hi, P=P, segment_bytes=segment_bytes)
+        assert np.array_equal(got, ref[(ref >= lo) & (ref < hi)])
+    assert list(iter_primes(0, 30, P=P)) == [2, 3, 5, 7, 11, 13, 17, 19, 23, 29]
+
+    for seg in wheel_segments(1000, 5000, P=P, segment_bytes=2048):
+        packed = seg.packed()
+        assert packed.shape == (seg.flags.shape[0], -(-len(seg.wheel.residues) // 8))
+        assert np.array_equal(np.unpackbits(packed, axis=1, count=seg.flags.shape[1]).astype(bool), seg.flags)
+
+
+def test_packed_masks_match_bool_masks():
+    from src.bitmask import WheelBitMask
+    from src.features import sieve_is_prime
+
+    dense = sieve_is_prime(50000)
+    packed = sieve_is_prime(50000, packed=True)
+    assert packed.bits.nbytes == -(-50001 // 8)
+    assert np.array_equal(packed.to_bool(), dense)
+    assert packed.count() == int(dense.sum()) and packed.count(100, 2000) == int(dense[100:2000].sum())
+    assert np.array_equal(packed[1234:4321], dense[1234:4321])
+    assert list(packed) == np.flatnonzero(dense).tolist()
+    assert [packed[n] for n in range(60)] == dense[:60].tolist()
+
+    cand = candidate_mask(9000, [2, 3, 5, 7], start=333)
+    cand_packed = candidate_mask(9000, [2, 3, 5, 7], start=333, packed=True)
+    assert np.array_equal(cand_packed[333:9001], cand) and cand_packed.count() == int(cand.sum())
+
+    wheel_mask = WheelBitMask.from_segments(wheel_segments(0, 50001, P=30, segment_bytes=256))
+    assert wheel_mask.bits.shape == (1667, 1)  # one byte per 30 integers
+    expected = dense.copy()
+    expected[[2, 3, 5]] = False  # factors of P have no residue bit
+    assert np.array_equal(wheel_mask.to_bool(0, 50001), expected)
+    assert wheel_mask.count() == int(expected.sum())
+    assert list(wheel_mask) == np.flatnonzero(expected).tolist()
+
+
+@pytest.mark.parametrize("P", [30, 2310, 30030])
+def test_wheel_arrays_and_tiled_candidate_mask(P: int):
+    w = residues_and_gaps(P)
+    assert w.gap_table.shape == w.coprime.shape == (P,)
+    for r in range(P):
+        assert w.gap_table[r] == w.gap_of_residue.get(r or P, 0)
+        assert w.coprime[r] == (gcd(r, P) == 1)
+    ns = np.arange(P, 3 * P + 17)
+    assert np.array_equal(w.gaps_for(ns), w.gap_table[ns % P])
+
+    pf = factorize_squarefree(P)
+    for start, B in [(0, 3 * P + 5), (P - 3, 5 * P), (7 * P + 11, 7 * P + 12)]:
+        expected = np.array([n > 1 and all(n % q for q in pf) for n in range(start, B + 1)])
+        assert np.array_equal(candidate_mask(B, pf, start=start), expected)
+        assert np.array_equal(w.coprime_mask(max(start, 2), B + 1), expected[max(0, 2 - start) :])
+
+
+@pytest.mark.parametrize("P", [1, 12, 2310, 30030])
+def test_compact_wheel_matches_full_wheel(P: int):
+    full = residues_and_gaps(P)
+    compact = residues_and_gaps(P, compact=True)
+    assert compact.residues.dtype == np.uint32 and compact.gaps.dtype == np.uint16
+    assert compact.gap_table is None and compact.coprime is None
+    assert compact.residues.tolist() == full.residues and compact.gaps.tolist() == full.gaps
+    assert dict(compact.gap_of_residue) == full.gap_of_residue and compact.max_gap == full.max_gap
+    ns = np.arange(2 * P + 7)
+    assert np.array_equal(compact.gaps_for(ns), full.gaps_for(ns))
+    assert np.array_equal(compact.coprime_mask(5, 2 * P), full.coprime_mask(5, 2 * P))
+
+
+def test_compact_wheel_19_primorial():
+    w = residues_and_gaps(9699690, compact=True)
+    assert len(w.residues) == 1658880 and int(w.gaps.sum()) == 9699690
+    assert w.gap_of_residue[1] == 22 and w.gap_of(9699690 + 23) == 6 and w.gap_of(9699690 + 2) == 0
+
+
+def test_tower_window_sieve_matches_classify():
+    from src.ascii_tower import classify, classify_window, tower_candidates, verify_primes
+
+    rays = [7, 11, 13, 4]
+    for lo, hi in [(-20, 400), (10**9 - 3000, 10**9 + 3000)]:
+        is_prime, factor = classify_window(lo, hi, rays)
+        for n in range(lo, hi + 1):
+            status, f = classify(n, rays=rays)
+            assert (status == "prime", f or 0) == (bool(is_prime[n - lo]), int(factor[n - lo]))
+
+    rows = tower_candidates(30, 30 * 10**6, 500, rays)
+    assert [abs(side) for side, *_ in rows] == sorted(abs(side) for side, *_ in rows)
+    assert all(gcd(n, 30) == 1 and n != 30 * 10**6 for _, n, _, _ in rows)
+    verify_primes(rows)
+
+def test_iter_tower_streams_and_pages(monkeypatch):
+    import itertools
+    import math
+
+    import src.ascii_tower as tower
+    from src.ascii_tower import iter_tower, tower_candidates
+
+    rays = [7, 11, 13, 4]
+    full = tower_candidates(210, 210 * 10**5, 3000, rays)
+    streamed = list(iter_tower(210, 210 * 10**5, 3000, rays, first_block=7, max_block=50))
+    assert streamed == full
+    assert [(side, n) for side, n, _, _ in full] == sorted(
+        ((side, n) for side, n, _, _ in full), key=lambda t: (abs(t[0]), t[0]))
+    page = list(itertools.islice(iter_tower(210, 210 * 10**5, 10**12, rays), 40, 60))
+    assert page == full[40:60]
+
+    # sieved while the band's sqrt(top) stays under the limit, Miller-Rabin past it
+    monkeypatch.setattr(tower, "SIEVE_BASE_MAX", math.isqrt(210 * 10**5 + 1000))
+    assert list(iter_tower(210, 210 * 10**5, 3000, rays, first_block=7, max_block=50)) == full
+
+def test_is_prime64_batch_matches_scalar(monkeypatch):
+    from concurrent.futures import ProcessPoolExecutor
+
+    import src.ascii_tower as tower
+    from src.primality import is_prime64, is_prime64_batch
+
+    rng = np.random.default_rng(3)
+    ns = np.concatenate((
+        np.arange(0, 5000, dtype=np.uint64),
+        rng.integers(1 << 31, 1 << 32, 3000, dtype=np.uint64),
+        rng.integers(1 << 40, 1 << 63, 3000).astype(np.uint64) | np.uint64(1),
+        np.array([2047, 25326001, 3215031751, 4759123141, 3825123056546413051, (1 << 61) - 1, (1 << 64) - 59], dtype=np.uint64),
+    ))
+    assert is_prime64_batch(ns).tolist() == [is_prime64(n) for n in ns.tolist()]
+    assert is_prime64_batch(ns[:10].reshape(2, 5)).tolist() == [[False, False, True, True, False], [True, False, True, False, False]]
+
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        assert is_prime64_batch(ns, pool=pool, chunk_size=500).tolist() == [is_prime64(n) for n in ns.tolist()]
+
+    sieved = tower.tower_candidates(30, 30 * 10**6, 400, [7, 4])
+    monkeypatch.setattr(tower, "SIEVE_BASE_MAX", 0)  # force the Miller-Rabin path
+    monkeypatch.setattr(tower, "is_prime64", None)  # classify reuses the batch verdicts
+    assert tower.tower_candidates(30, 30 * 10**6, 400, [7, 4]) == sieved
+    assert list(tower.iter_tower(30, 30 * 10**6, 400, [7, 4], jobs=2)) == sieved
+
+
+def test_tower_machine_formats(capsys):
+    import csv
+    import io
+    import json
+
+    from src.ascii_tower import TOWER_FIELDS, tower, tower_candidates
+    from src.output import write_records
+
+    rows = tower_candidates(30, 300, 50, [7])[5:15]
+    tower(30, 10, 50, [7], max_print=10, show_polarity=False, show_signature=False, offset=5, fmt="jsonl")
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [(r["side"], r["n"], r["status"], r["factor"]) for r in records] == rows
+    assert all(r["residue"] == r["n"] % 30 and r["sig7"] == r["n"] % 7 for r in records)
+
+    tower(30, 10, 50, [7], max_print=10, show_polarity=False, show_signature=False, offset=5, fmt="json", verify=True)
+    assert json.loads(capsys.readouterr().out) == records
+    tower(30, 10, 50, [7], max_print=10, show_polarity=False, show_signature=False, offset=5, fmt="csv")
+    table = list(csv.DictReader(io.StringIO(capsys.readouterr().out)))
+    assert tuple(table[0]) == TOWER_FIELDS and [int(r["n"]) for r in table] == [r["n"] for r in records]
+
+    buf = io.StringIO()
+    assert write_records([{"P@1": float("nan")}], "json", ["P@1"], buf) == 1
+    assert json.loads(buf.getvalue()) == [{"P@1": None}]
+    with pytest.raises(ValueError):
+        write_records([], "xml", [], buf)
+
+
+def test_guasti_core_runs_as_a_script():
+    import pathlib
+    import subprocess
+    import sys
+
+    root = pathlib.Path(__file__).resolve().parents[1]
+    script = subprocess.run([sys.executable, "guasti_core.py"], cwd=root, capture_output=True, text=True)
+    assert script.returncode == 0, script.stderr
+    assert "Verification complete." in script.stdout
+    imported = subprocess.run([sys.executable, "-c", "import guasti_core; print(guasti_core.is_prime(2**61 - 1))"],
+                              cwd=root, capture_output=True, text=True)
+    assert imported.returncode == 0 and imported.stdout.strip() == "True", imported.stderr